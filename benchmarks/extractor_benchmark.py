@@ -0,0 +1,80 @@
+"""Micro-benchmark product page extraction on recorded pages.
+
+    python -m benchmarks.extractor_benchmark --repeat 200
+
+Compares the previous per-field regex parse of utagData (and the full-page
+``re.findall`` image scan) with ``selenium_utils.hepsiburada_extractor``.
+Pure Python, no browser or network needed.
+"""
+import argparse
+import re
+import time
+from typing import Callable, Dict, List
+from benchmarks.replay_server import find_pages, HEPSIBURADA_IMAGE_CDN
+from selenium_utils.hepsiburada_extractor import extract_product, extract_image_urls, convert_price_str_to_float
+
+def legacy_parse(html: str) -> Dict:
+    """The regex-per-field parse the scrapers used before the extractor."""
+    script_match = re.search(r'const utagData = ({.*?});', html, re.DOTALL)
+    if not script_match:
+        return {}
+    script_content = script_match.group(1)
+    details = {}
+
+    name_match = re.search(r'"product_name_array":"([^"]+)"', script_content)
+    details['Product Name'] = name_match.group(1) if name_match else "Unknown"
+    price_match = re.search(r'"product_prices":\["([^"]+)"\]', script_content)
+    details['Price'] = convert_price_str_to_float(price_match.group(1)) if price_match else 0.0
+    category_match = re.search(r'"category_name_hierarchy":"([^"]+)"', script_content)
+    details['Category'] = category_match.group(1).split(' > ')[-1] if category_match else "Unknown"
+    rating_match = re.search(r'"review_rate":"([^"]+)"', script_content)
+    details['Rating'] = rating_match.group(1) if rating_match else "Not yet evaluated"
+
+    cdn_matches = re.findall(
+        re.escape(HEPSIBURADA_IMAGE_CDN) + r'[^"\' >]+\.(?:jpg|jpeg|png)(?:/format:webp)?',
+        html,
+        re.IGNORECASE,
+    )
+    details['Image URL'] = cdn_matches[0] if cdn_matches else None
+    return details
+
+def extractor_parse(html: str) -> Dict:
+    product = extract_product(html)
+    details = product.to_details() if product else {}
+    image_urls = extract_image_urls(html, HEPSIBURADA_IMAGE_CDN, limit=1)
+    details['Image URL'] = image_urls[0] if image_urls else None
+    return details
+
+def time_parser(parse: Callable[[str], Dict], pages: List[str], repeat: int) -> float:
+    """Mean milliseconds per page."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for html in pages:
+            parse(html)
+    return (time.perf_counter() - start) * 1000 / (repeat * len(pages))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark product page extraction.")
+    parser.add_argument("--pages-dir", help="directory of recorded .html pages (default: debug_hepsiburada.html)")
+    parser.add_argument("--repeat", type=int, default=100, help="passes over the recorded pages")
+    args = parser.parse_args()
+
+    pages = []
+    for path in find_pages(args.pages_dir):
+        with open(path, "r", encoding="utf-8") as file:
+            pages.append(file.read())
+    print(f"{len(pages)} pages, {sum(map(len, pages)) / len(pages) / 1024:.0f} KiB on average")
+
+    for html in pages:
+        legacy, current = legacy_parse(html), extractor_parse(html)
+        for key in current:
+            if legacy.get(key) != current[key]:
+                print(f"  {key} differs: {legacy.get(key)!r} -> {current[key]!r}")
+
+    legacy_ms = time_parser(legacy_parse, pages, args.repeat)
+    extractor_ms = time_parser(extractor_parse, pages, args.repeat)
+    print(f"   regex: {legacy_ms:.3f} ms/page")
+    print(f"  parser: {extractor_ms:.3f} ms/page ({legacy_ms / extractor_ms:.1f}x)")
+
+if __name__ == "__main__":
+    main()
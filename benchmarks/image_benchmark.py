@@ -0,0 +1,89 @@
+"""Micro-benchmark thumbnail preparation for ``product_images``.
+
+    python -m benchmarks.image_benchmark --images-dir saved_images --repeat 20
+
+Compares the previous full decode + PNG encode with ``ImageProcessor`` in
+each output format and reports stored bytes and milliseconds per image.
+Without ``--images-dir`` a product-sized JPEG (1500x1500, the size the
+HepsiBurada CDN serves for zoom images) is generated from
+``debug_hepsiburada.png``.
+"""
+import argparse
+import glob
+import io
+import os
+import time
+from typing import Callable, List, Optional
+from PIL import Image
+from utils.image_utils import ImageProcessor
+
+DEFAULT_IMAGE = "debug_hepsiburada.png"
+IMAGE_PATTERNS = ("*.jpg", "*.jpeg", "*.png", "*.webp")
+
+def legacy_prepare(data: bytes) -> Optional[bytes]:
+    """The full-size decode and PNG encode ImageProcessor used before."""
+    with Image.open(io.BytesIO(data)) as img:
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        img.thumbnail(ImageProcessor.TARGET_SIZE, Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        img.save(buffer, format='PNG')
+        return buffer.getvalue()
+
+def load_images(images_dir: Optional[str]) -> List[bytes]:
+    if images_dir:
+        paths = sorted(path for pattern in IMAGE_PATTERNS for path in glob.glob(os.path.join(images_dir, pattern)))
+        if not paths:
+            raise SystemExit(f"No images found in {images_dir}")
+        images = []
+        for path in paths:
+            with open(path, "rb") as file:
+                images.append(file.read())
+        return images
+
+    with Image.open(DEFAULT_IMAGE) as img:
+        img = img.convert('RGB').resize((1500, 1500), Image.Resampling.BICUBIC)
+        buffer = io.BytesIO()
+        img.save(buffer, format='JPEG', quality=90)
+        return [buffer.getvalue()]
+
+def measure(prepare: Callable[[bytes], Optional[bytes]], images: List[bytes], repeat: int):
+    """Mean milliseconds and mean output bytes per image."""
+    output_bytes = sum(len(prepare(data) or b"") for data in images)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for data in images:
+            prepare(data)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return elapsed_ms / (repeat * len(images)), output_bytes / len(images)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark product image thumbnails.")
+    parser.add_argument("--images-dir", help=f"directory of source images (default: JPEG made from {DEFAULT_IMAGE})")
+    parser.add_argument("--repeat", type=int, default=20, help="passes over the images")
+    parser.add_argument("--quality", type=int, default=ImageProcessor.QUALITY, help="WEBP/JPEG quality")
+    args = parser.parse_args()
+
+    images = load_images(args.images_dir)
+    print(f"{len(images)} images, {sum(map(len, images)) / len(images) / 1024:.0f} KiB on average")
+
+    variants = [("PNG (before)", legacy_prepare)]
+    for output_format in ("WEBP", "JPEG"):
+        if ImageProcessor.output_format(output_format) != output_format:
+            print(f"  {output_format} is not supported by this Pillow build, skipped")
+            continue
+        variants.append((output_format, lambda data, f=output_format: ImageProcessor.prepare_image_for_db(
+            io.BytesIO(data), output_format=f, quality=args.quality)))
+
+    baseline_ms, baseline_bytes = None, None
+    for name, prepare in variants:
+        ms, size = measure(prepare, images, args.repeat)
+        if baseline_ms is None:
+            baseline_ms, baseline_bytes = ms, size
+            print(f"  {name:>12}: {ms:7.2f} ms/image {size / 1024:7.1f} KiB/image")
+        else:
+            print(f"  {name:>12}: {ms:7.2f} ms/image {size / 1024:7.1f} KiB/image "
+                  f"({baseline_ms / ms:.1f}x faster, {baseline_bytes / size:.1f}x smaller)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Local OpenAI-compatible chat completions server for feature scoring runs.
+
+``POST /v1/chat/completions`` answers with a JSON object scoring every
+feature of the request (the keys of a ``json_schema`` response format, or
+the ``- "feature"`` lines of the prompt). Scores are derived from the
+prompt, so repeated runs give the same numbers. Latency, random 429/500
+errors and a requests/min limit can be injected to exercise retries and
+rate limiting without an API key.
+
+    python -m benchmarks.mock_openai_server --port 8766 --latency-ms 300 --error-rate 0.05
+    OPENAI_BASE_URL=http://127.0.0.1:8766/v1 OPENAI_API_KEY=mock python -m data_writer.product_features_writer
+"""
+import argparse
+import collections
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+FEATURE_LINE = re.compile(r'^- "([^"]+)"$', re.MULTILINE)
+
+class MockOpenAIServer:
+    def __init__(self, latency_ms: float = 200, error_rate: float = 0.0, rpm_limit: Optional[int] = None,
+                 host: str = "127.0.0.1", port: int = 0):
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.rpm_limit = rpm_limit
+        self.stats = {"requests": 0, "ok": 0, "rate_limited": 0, "errors": 0, "prompt_chars": 0}
+        self._recent = collections.deque()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "MockOpenAIServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-openai", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def complete(self, request: Dict) -> Dict:
+        prompt = "\n".join(message.get("content") or "" for message in request.get("messages", []))
+        schema = (request.get("response_format") or {}).get("json_schema", {}).get("schema")
+        features: List[str] = schema["required"] if schema else FEATURE_LINE.findall(prompt)
+        scores = {
+            feature: int(hashlib.sha256(f"{prompt}|{feature}".encode("utf-8")).hexdigest(), 16) % 11
+            for feature in features
+        }
+        content = json.dumps(scores)
+        with self._lock:
+            self.stats["prompt_chars"] += len(prompt)
+        return {
+            "id": f"chatcmpl-mock-{random.getrandbits(48):x}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "gpt-4o-mini"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": len(prompt) // 4,
+                "completion_tokens": len(content) // 4,
+                "total_tokens": (len(prompt) + len(content)) // 4,
+            },
+        }
+
+    def _over_rate_limit(self) -> bool:
+        if not self.rpm_limit:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            while self._recent and now - self._recent[0] > 60:
+                self._recent.popleft()
+            if len(self._recent) >= self.rpm_limit:
+                return True
+            self._recent.append(now)
+            return False
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                server._count("requests")
+                if self.path.rstrip("/") != "/v1/chat/completions":
+                    self._send_json(404, {"error": {"message": "not found", "type": "invalid_request_error"}})
+                    return
+                if server._over_rate_limit():
+                    server._count("rate_limited")
+                    self._send_json(429, {"error": {"message": "Rate limit reached", "type": "requests"}},
+                                    {"Retry-After": "1"})
+                    return
+
+                time.sleep(server.latency_ms / 1000 * random.uniform(0.5, 1.5))
+                if random.random() < server.error_rate:
+                    server._count("errors")
+                    status = random.choice((429, 500, 503))
+                    self._send_json(status, {"error": {"message": "Injected failure", "type": "server_error"}})
+                    return
+
+                server._count("ok")
+                self._send_json(200, server.complete(json.loads(body or b"{}")))
+
+            def _send_json(self, status: int, payload: Dict, headers: Optional[Dict[str, str]] = None):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a mock OpenAI chat completions API locally.")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency-ms", type=float, default=200, help="mean response latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 429/500/503")
+    parser.add_argument("--rpm-limit", type=int, help="answer 429 above this many requests per minute")
+    args = parser.parse_args()
+
+    server = MockOpenAIServer(args.latency_ms, args.error_rate, args.rpm_limit, port=args.port)
+    print(f"Mock OpenAI API at {server.base_url}")
+    try:
+        server.start()
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(f"Served: {server.stats}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Local HTTP server that replays recorded product pages.
+
+Every request for ``/page/<name>`` (any query string) is answered with the
+recorded ``<name>.html``; product image URLs inside the pages are rewritten
+to ``/productimages/...`` on the same server and answered with a recorded
+image. Nothing leaves the machine, so scraper changes can be measured
+without hitting the live site.
+
+    python -m benchmarks.replay_server --port 8765
+"""
+import argparse
+import glob
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+DEFAULT_PAGES = ["debug_hepsiburada.html"]
+DEFAULT_IMAGE = "debug_hepsiburada.png"
+HEPSIBURADA_IMAGE_CDN = "https://productimages.hepsiburada.net"
+
+class ReplayServer:
+    def __init__(self, pages: Optional[List[str]] = None, image_path: str = DEFAULT_IMAGE,
+                 host: str = "127.0.0.1", port: int = 0):
+        self.pages: Dict[str, bytes] = {}
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._thread: Optional[threading.Thread] = None
+
+        with open(image_path, "rb") as file:
+            self.image = file.read()
+        self.image_type = "image/png" if image_path.lower().endswith(".png") else "image/jpeg"
+
+        for path in pages or DEFAULT_PAGES:
+            with open(path, "r", encoding="utf-8") as file:
+                html = file.read()
+            name = os.path.splitext(os.path.basename(path))[0]
+            self.pages[name] = html.replace(HEPSIBURADA_IMAGE_CDN, self.image_cdn).encode("utf-8")
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def image_cdn(self) -> str:
+        return f"{self.base_url}/productimages"
+
+    def page_urls(self, count: int) -> List[str]:
+        """*count* distinct URLs cycling over the recorded pages."""
+        names = sorted(self.pages)
+        return [f"{self.base_url}/page/{names[i % len(names)]}?n={i}" for i in range(count)]
+
+    def start(self) -> "ReplayServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="replay-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                if path.startswith("/productimages/"):
+                    self._send(200, server.image, server.image_type)
+                elif path.startswith("/page/") and path[len("/page/"):] in server.pages:
+                    self._send(200, server.pages[path[len("/page/"):]], "text/html; charset=utf-8")
+                else:
+                    self._send(404, b"not found", "text/plain")
+
+            def _send(self, status: int, body: bytes, content_type: str):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+def find_pages(pages_dir: Optional[str]) -> List[str]:
+    if not pages_dir:
+        return DEFAULT_PAGES
+    return sorted(glob.glob(os.path.join(pages_dir, "*.html")))
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recorded product pages locally.")
+    parser.add_argument("--pages-dir", help="directory of recorded .html pages (default: debug_hepsiburada.html)")
+    parser.add_argument("--image", default=DEFAULT_IMAGE, help="image served for every product image URL")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    server = ReplayServer(find_pages(args.pages_dir), args.image, port=args.port)
+    print(f"Serving {len(server.pages)} recorded pages at {server.base_url}/page/<name>")
+    try:
+        server.start()
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
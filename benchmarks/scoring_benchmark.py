@@ -0,0 +1,47 @@
+"""Benchmark feature scoring throughput against the local mock OpenAI server.
+
+    python -m benchmarks.scoring_benchmark --products 200 --concurrency 1 8 16 --error-rate 0.05
+
+Runs ``FeatureScoringEngine.score_products`` over synthetic products once
+per concurrency level and reports products/sec, requests, retries and
+failures. Nothing is written to the database and no API key is needed.
+"""
+import argparse
+import openai
+from benchmarks.mock_openai_server import MockOpenAIServer
+from data_writer.feature_scoring_engine import FeatureScoringEngine
+from data_writer.product_features_writer import ProductFeatureWriter
+
+def synthetic_products(count: int):
+    return [
+        (i, f"Product {i}", f"Category {i % 25}", f"Description of product {i}. " * 20)
+        for i in range(count)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent feature scoring.")
+    parser.add_argument("--products", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--scoring-mode", choices=ProductFeatureWriter.SCORING_MODES, default="single")
+    parser.add_argument("--latency-ms", type=float, default=200, help="mean mock response latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of mock requests that fail with 429/5xx")
+    parser.add_argument("--rpm", type=float, default=6000, help="requests per minute limit of the engine")
+    parser.add_argument("--tpm", type=float, default=2_000_000, help="tokens per minute limit of the engine")
+    args = parser.parse_args()
+
+    products = synthetic_products(args.products)
+    with MockOpenAIServer(args.latency_ms, args.error_rate) as server:
+        client = openai.OpenAI(api_key="mock", base_url=server.base_url)
+        for concurrency in args.concurrency:
+            engine = FeatureScoringEngine(
+                client, args.scoring_mode, concurrency, args.rpm, args.tpm, base_delay=0.2, max_delay=2.0
+            )
+            for _ in engine.score_products(products):
+                pass
+            stats = engine.stats
+            print(f"  concurrency {concurrency:>3}: {stats['products'] / stats['seconds']:6.1f} products/s "
+                  f"({stats['seconds']:.1f} s, {stats['requests']} requests, {stats['retries']} retries, "
+                  f"{stats['failed']} failed, ~{stats['estimated_tokens'] / max(stats['products'], 1):.0f} tokens/product)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Benchmark the HepsiBurada scrapers against recorded pages.
+
+    python -m benchmarks.scraper_benchmark --mode both --pages 50
+
+Starts a local ReplayServer, runs ``get_product_details`` on every page with
+the Selenium scraper and/or the HTTP scraper, and reports pages/sec, p50/p99
+latency and peak RSS (this process plus its children, i.e. chromedriver and
+Chrome).
+
+``--block-resources`` and ``--eager`` configure the Selenium scraper;
+``--compare-blocking`` runs it once plain and once with both enabled and
+reports the navigation time saved per page.
+"""
+import argparse
+import os
+import statistics
+import time
+from typing import Callable, Dict, List
+import psutil
+from benchmarks.replay_server import ReplayServer, find_pages, DEFAULT_IMAGE
+from selenium_utils.scrapper import HepsiBuradaScraper, HepsiBuradaHttpScraper
+
+class RssSampler:
+    """Peak resident memory of this process tree, sampled between pages."""
+
+    def __init__(self):
+        self.peak_bytes = 0
+
+    def sample(self):
+        process = psutil.Process(os.getpid())
+        total = 0
+        for proc in [process] + process.children(recursive=True):
+            try:
+                total += proc.memory_info().rss
+            except psutil.Error:
+                pass
+        self.peak_bytes = max(self.peak_bytes, total)
+
+    def peak_mb(self) -> float:
+        return self.peak_bytes / (1024 * 1024)
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+def run_benchmark(name: str, fetch: Callable[[str], Dict], urls: List[str], sampler: RssSampler,
+                  scraper=None) -> Dict:
+    latencies = []
+    page_loads = []
+    failures = 0
+    start = time.perf_counter()
+    for url in urls:
+        page_start = time.perf_counter()
+        try:
+            details = fetch(url)
+            if not details or not details.get("Price"):
+                failures += 1
+        except Exception as e:
+            print(f"[{name}] {url}: {e}")
+            failures += 1
+        latencies.append(time.perf_counter() - page_start)
+        if scraper is not None:
+            page_loads.append(scraper.last_page_load_seconds)
+        sampler.sample()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "mode": name,
+        "pages": len(urls),
+        "failures": failures,
+        "pages_per_sec": len(urls) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "peak_rss_mb": sampler.peak_mb(),
+        "page_load_ms": statistics.mean(page_loads) * 1000 if page_loads else None,
+    }
+
+def print_result(result: Dict):
+    print(
+        f"{result['mode']:>9}: {result['pages']} pages, {result['failures']} failed, "
+        f"{result['pages_per_sec']:.2f} pages/s, p50 {result['p50_ms']:.1f} ms, "
+        f"p99 {result['p99_ms']:.1f} ms, peak RSS {result['peak_rss_mb']:.0f} MB"
+        + (f", navigation {result['page_load_ms']:.1f} ms/page" if result['page_load_ms'] is not None else "")
+    )
+
+def run_selenium(name: str, server: ReplayServer, urls: List[str], args, **scraper_kwargs) -> Dict:
+    class ReplayHepsiBuradaScraper(HepsiBuradaScraper):
+        IMAGE_CDN = server.image_cdn
+
+    startup = time.perf_counter()
+    scraper = ReplayHepsiBuradaScraper(driver_path=args.driver_path, headless=not args.no_headless, **scraper_kwargs)
+    print(f"[{name}] driver startup: {(time.perf_counter() - startup) * 1000:.0f} ms")
+    try:
+        return run_benchmark(name, scraper.get_product_details, urls, RssSampler(), scraper)
+    finally:
+        scraper.quit()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scrapers against recorded pages.")
+    parser.add_argument("--mode", choices=["selenium", "http", "both"], default="both")
+    parser.add_argument("--pages", type=int, default=20, help="number of page loads per mode")
+    parser.add_argument("--pages-dir", help="directory of recorded .html pages (default: debug_hepsiburada.html)")
+    parser.add_argument("--image", default=DEFAULT_IMAGE, help="image served for product image URLs")
+    parser.add_argument("--driver-path", default="selenium_utils/driver/chromedriver.exe")
+    parser.add_argument("--no-headless", action="store_true")
+    parser.add_argument("--block-resources", action="store_true", help="block images, fonts, CSS, media and trackers")
+    parser.add_argument("--eager", action="store_true", help="use the eager page load strategy")
+    parser.add_argument("--compare-blocking", action="store_true", help="run Selenium with and without blocking")
+    args = parser.parse_args()
+
+    with ReplayServer(find_pages(args.pages_dir), args.image) as server:
+        urls = server.page_urls(args.pages)
+        results = []
+
+        if args.mode in ("http", "both"):
+            http_scraper = HepsiBuradaHttpScraper()
+            try:
+                results.append(run_benchmark("http", http_scraper.get_product_details, urls, RssSampler()))
+            finally:
+                http_scraper.quit()
+
+        if args.mode in ("selenium", "both"):
+            if args.compare_blocking:
+                baseline = run_selenium("selenium", server, urls, args)
+                blocked = run_selenium("blocked", server, urls, args, block_resources=True, page_load_strategy="eager")
+                results += [baseline, blocked]
+                saved_ms = baseline["page_load_ms"] - blocked["page_load_ms"]
+                print(f"Resource blocking + eager load saves {saved_ms:.1f} ms of navigation per page")
+            else:
+                results.append(run_selenium(
+                    "selenium", server, urls, args,
+                    block_resources=args.block_resources,
+                    page_load_strategy="eager" if args.eager else "normal",
+                ))
+
+    for result in results:
+        print_result(result)
+
+if __name__ == "__main__":
+    main()
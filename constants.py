@@ -1,4 +1,5 @@
-from selenium_utils.scrapper import HepsiBuradaScraper, AmazonScraper
+from selenium_utils.scrapper import HepsiBuradaScraper, HepsiBuradaHttpScraper, AmazonScraper
+from selenium_utils.listing_crawler import HepsiBuradaListingCrawler
 
 # Product features and categorization prompts
 FEATURE_PROMPT = "You are a product analyst that scores products based on their relevance to specific features."
@@ -63,4 +64,20 @@ ALL_FEATURES = {
 WEB_SITES = {
     "HepsiBurada": HepsiBuradaScraper,
     "Amazon": AmazonScraper
-}
\ No newline at end of file
+}
+
+# Browser-less scrapers used as a fast path for price checks
+HTTP_SCRAPERS = {
+    "HepsiBurada": HepsiBuradaHttpScraper
+}
+
+# Most browsers run at once per site when fetching many product pages (Bulk Add Products)
+SITE_CONCURRENCY = {
+    "HepsiBurada": 4,
+    "Amazon": 2
+}
+
+# Sites whose category/search listings can price many tracked products per page load
+LISTING_CRAWLERS = {
+    "HepsiBurada": HepsiBuradaListingCrawler
+}
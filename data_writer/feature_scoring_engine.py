@@ -0,0 +1,216 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import openai
+import tiktoken
+from pydantic import ValidationError
+from constants import ALL_FEATURES, AGE_GROUPS, GENDERS, SPECIAL_OCCASIONS, INTERESTS
+from prompts import Prompts
+from db_operations.dbop_feature import DatabaseOperationsFeature
+
+# gpt-4o-mini limits of a tier 1 account; raise them for higher tiers
+DEFAULT_REQUESTS_PER_MINUTE = 500
+DEFAULT_TOKENS_PER_MINUTE = 200_000
+
+FEATURE_GROUPS = (AGE_GROUPS, GENDERS, SPECIAL_OCCASIONS, INTERESTS)
+
+# The gpt-4o family encoding; tiktoken downloads it on first use
+TOKEN_ENCODING = "o200k_base"
+TOKEN_ENCODING_TIMEOUT = 5.0
+
+_encoding = None
+_encoding_thread: Optional[threading.Thread] = None
+_encoding_deadline = 0.0
+_encoding_lock = threading.Lock()
+
+def _load_encoding():
+    global _encoding
+    try:
+        _encoding = tiktoken.get_encoding(TOKEN_ENCODING)
+    except Exception as e:
+        print(f"tiktoken encoding unavailable, estimating tokens from text length: {e}")
+
+def token_encoding() -> Optional["tiktoken.Encoding"]:
+    """The shared token encoding, or None while it cannot be loaded.
+
+    It is loaded once per process on a background thread. Callers wait at
+    most TOKEN_ENCODING_TIMEOUT seconds in total for it, so an offline
+    machine falls back to estimating from text length instead of blocking on
+    the download.
+    """
+    global _encoding_thread, _encoding_deadline
+    with _encoding_lock:
+        if _encoding_thread is None:
+            _encoding_deadline = time.monotonic() + TOKEN_ENCODING_TIMEOUT
+            _encoding_thread = threading.Thread(target=_load_encoding, name="tiktoken-load", daemon=True)
+            _encoding_thread.start()
+    _encoding_thread.join(max(0.0, _encoding_deadline - time.monotonic()))
+    return _encoding
+
+# (product_id, name, category, description) as returned by get_unprocessed_products
+Product = Tuple[int, str, str, str]
+ProgressCallback = Callable[[Dict], None]
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at *per_minute* tokens a minute."""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1):
+        """Block until *amount* tokens are available and take them."""
+        # A request larger than the bucket would never fit; let it through on a full bucket
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate
+            time.sleep(wait)
+
+class FeatureScoringEngine:
+    """Score many products with concurrent OpenAI calls inside the account's rate limits.
+
+    Up to *concurrency* products are scored at once. Every call first takes
+    one request from the requests/min bucket and its estimated prompt plus
+    reply tokens from the tokens/min bucket. 429, 5xx, timeout and
+    connection errors are retried up to *max_retries* times with full jitter
+    exponential back-off, honouring ``Retry-After`` when the server sends it;
+    a scoring reply that fails validation is requested once more.
+
+    Results are handed back in input order, and :meth:`run` writes them
+    through :class:`DatabaseOperationsFeature` on the calling thread,
+    committing each product on its own. Products that still fail are left
+    unscored, so the next run picks them up again.
+    """
+
+    def __init__(self, client: openai.OpenAI, scoring_mode: str = "single", concurrency: int = 8,
+                 requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+                 tokens_per_minute: float = DEFAULT_TOKENS_PER_MINUTE, max_retries: int = 5,
+                 base_delay: float = 1.0, max_delay: float = 60.0):
+        # Retries are done here, with jitter, instead of by the client
+        self.client = client.with_options(max_retries=0)
+        self.scoring_mode = scoring_mode
+        self.concurrency = max(1, concurrency)
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.stats = {"products": 0, "scored": 0, "failed": 0, "requests": 0, "retries": 0,
+                      "estimated_tokens": 0, "seconds": 0.0}
+        self._stats_lock = threading.Lock()
+
+    def score_products(self, products: List[Product]) -> Iterator[Tuple[Product, Dict[str, float], Optional[Exception]]]:
+        """Yield ``(product, scores, error)`` for every product, in the order given."""
+        start = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="feature-scoring") as executor:
+                # map keeps input order, so a slow product only delays the results behind it
+                yield from executor.map(self._score_product, products)
+        finally:
+            self.stats["seconds"] += time.perf_counter() - start
+
+    def run(self, products: List[Product], db: DatabaseOperationsFeature,
+            progress_callback: Optional[ProgressCallback] = None) -> Dict[str, float]:
+        """Score *products* and save their features; *db* must be connected."""
+        notify = progress_callback or (lambda event: None)
+        for product, scores, error in self.score_products(products):
+            product_id, name = product[0], product[1]
+            if error is not None or not scores:
+                print(f"Error updating product features for {name}: {error or 'no scores returned'}")
+                notify({"type": "error", "product_id": product_id, "message": str(error)})
+                continue
+
+            try:
+                features_id = db.create_product_features()
+                db.update_product_features(features_id, list(scores.items()))
+                db.link_product_features(product_id, features_id)
+                # One transaction per product: a failed write only loses that product
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                print(f"Error saving product features for {name}: {e}")
+                notify({"type": "error", "product_id": product_id, "message": str(e)})
+                continue
+            print(f"Successfully updated features for product: {name}")
+            notify({"type": "progress", "product_id": product_id, "stats": dict(self.stats)})
+        return dict(self.stats)
+
+    def _score_product(self, product: Product) -> Tuple[Product, Dict[str, float], Optional[Exception]]:
+        _, name, category, description = product
+        product_info = {"name": name, "category": category, "description": description}
+        self._count("products")
+        try:
+            if self.scoring_mode == "single":
+                scores = self._request(product_info, ALL_FEATURES, strict=True)
+            else:
+                scores = {}
+                for features in FEATURE_GROUPS:
+                    scores.update(self._request(product_info, features, strict=False))
+            self._count("scored" if scores else "failed")
+            return product, scores, None
+        except Exception as e:
+            self._count("failed")
+            return product, {}, e
+
+    def _request(self, product_info: Dict, features: Dict, strict: bool) -> Dict[str, int]:
+        tokens = self._estimate_tokens(product_info, features)
+        validation_retried = False
+        for attempt in range(self.max_retries + 1):
+            self.request_bucket.acquire(1)
+            self.token_bucket.acquire(tokens)
+            self._count("requests")
+            self._count("estimated_tokens", tokens)
+            try:
+                return Prompts.request_feature_scores(self.client, product_info, features, strict=strict)
+            except ValidationError:
+                # A reply Prompts.parse_feature_scores could not repair is asked for once more
+                if validation_retried or attempt == self.max_retries:
+                    raise
+                validation_retried = True
+                self._count("retries")
+            except Exception as e:
+                if attempt == self.max_retries or not self._is_retryable(e):
+                    raise
+                self._count("retries")
+                time.sleep(self._retry_delay(e, attempt))
+
+    def _estimate_tokens(self, product_info: Dict, features: Dict) -> int:
+        text = "".join(message["content"] for message in Prompts.feature_scoring_messages(product_info, features))
+        encoding = token_encoding()
+        prompt_tokens = len(encoding.encode(text)) if encoding is not None else len(text) // 4
+        # The reply is a JSON object of integer scores, roughly 8 tokens per feature
+        return prompt_tokens + 8 * len(features)
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        if isinstance(error, openai.APIConnectionError):
+            return True
+        return isinstance(error, openai.APIStatusError) and (error.status_code == 429 or error.status_code >= 500)
+
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        retry_after = None
+        response = getattr(error, "response", None)
+        if response is not None:
+            try:
+                retry_after = float(response.headers.get("retry-after"))
+            except (TypeError, ValueError):
+                pass
+        # Full jitter: spread the retries of concurrent workers over the whole back-off window
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        return max(delay, retry_after) if retry_after is not None else delay
+
+    def _count(self, key: str, amount: float = 1):
+        with self._stats_lock:
+            self.stats[key] += amount
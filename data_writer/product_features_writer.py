@@ -1,55 +1,63 @@
+import argparse
 from dotenv import load_dotenv
 import openai
 import os
-from typing import Dict
+from typing import Dict, Optional
 from constants import ALL_FEATURES, AGE_GROUPS, GENDERS, SPECIAL_OCCASIONS, INTERESTS
 from prompts import Prompts
 from db_operations.dbop_feature import DatabaseOperationsFeature
+from data_writer.feature_scoring_engine import FeatureScoringEngine, DEFAULT_REQUESTS_PER_MINUTE, DEFAULT_TOKENS_PER_MINUTE
 
 class ProductFeatureWriter:
-    def __init__(self):
+    # "single" scores ALL_FEATURES in one structured call; "grouped" makes one call per
+    # feature group (the original mode, kept to compare score quality)
+    SCORING_MODES = ("single", "grouped")
+
+    def __init__(self, scoring_mode: str = "single", base_url: Optional[str] = None):
+        """*base_url* (default ``OPENAI_BASE_URL``, else the OpenAI API) can point
+        the writer at any OpenAI-compatible server, e.g. ``benchmarks.mock_openai_server``."""
+        if scoring_mode not in self.SCORING_MODES:
+            raise ValueError(f"Unknown scoring mode: {scoring_mode}")
         load_dotenv()
-        self.client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"), base_url=base_url or os.getenv("OPENAI_BASE_URL"))
         self.db = DatabaseOperationsFeature()
+        self.scoring_mode = scoring_mode
         
     def _score_feature(self, product_info: Dict, feature: str) -> float:
         return Prompts.get_feature_score(self.client, product_info, feature)
 
-    def update_product_features(self):
+    def score_product(self, product_info: Dict) -> Dict[str, float]:
+        """Scores for every feature of *product_info* (name, category, description)."""
+        if self.scoring_mode == "single":
+            return Prompts.score_all_features(self.client, product_info, ALL_FEATURES)
+
+        scores = {}
+        for features in (AGE_GROUPS, GENDERS, SPECIAL_OCCASIONS, INTERESTS):
+            scores.update(Prompts.score_feature_group(self.client, product_info, features))
+        return scores
+
+    def update_product_features(self, concurrency: int = 8,
+                                requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+                                tokens_per_minute: float = DEFAULT_TOKENS_PER_MINUTE) -> Dict[str, float]:
+        """Score every product without features, *concurrency* products at a time."""
+        engine = FeatureScoringEngine(
+            self.client,
+            scoring_mode=self.scoring_mode,
+            concurrency=concurrency,
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+        )
         self.db.connect()
         try:
             products = self.db.get_unprocessed_products()
-            
-            for product in products:
-                product_id, name, category, description = product
-                product_info = {
-                    "name": name,
-                    "category": category,
-                    "description": description
-                }
-                
-                features_id = self.db.create_product_features()
-                feature_updates = []
-                
-                age_scores = Prompts.score_feature_group(self.client, product_info, AGE_GROUPS)
-                gender_scores = Prompts.score_feature_group(self.client, product_info, GENDERS)
-                special_scores = Prompts.score_feature_group(self.client, product_info, SPECIAL_OCCASIONS)
-                interest_scores = Prompts.score_feature_group(self.client, product_info, INTERESTS)
-                
-                combined_scores = {**age_scores, **gender_scores, **special_scores, **interest_scores}
-                for field, score in combined_scores.items():
-                    feature_updates.append((field, score))
-                
-                self.db.update_product_features(features_id, feature_updates)
-                self.db.link_product_features(product_id, features_id)
-                self.db.commit()
-                
-                print(f"Successfully updated features for product: {name}")
-                
+            stats = engine.run(products, self.db)
+            print(f"Scored {stats['scored']}/{stats['products']} products in {stats['seconds']:.1f} s "
+                  f"({stats['requests']} requests, {stats['retries']} retries)")
+            return stats
         except Exception as e:
             self.db.rollback()
             print(f"Error updating product features: {e}")
-            
+            return dict(engine.stats)
         finally:
             self.db.close()
 
@@ -62,12 +70,7 @@ class ProductFeatureWriter:
                 "description": product_info["description"]
             }
             
-            age_scores = Prompts.score_feature_group(self.client, product_data, AGE_GROUPS)
-            gender_scores = Prompts.score_feature_group(self.client, product_data, GENDERS)
-            special_scores = Prompts.score_feature_group(self.client, product_data, SPECIAL_OCCASIONS)
-            interest_scores = Prompts.score_feature_group(self.client, product_data, INTERESTS)
-            
-            return {**age_scores, **gender_scores, **special_scores, **interest_scores}
+            return self.score_product(product_data)
             
         except Exception as e:
             print(f"Error calculating product features: {e}")
@@ -92,5 +95,13 @@ class ProductFeatureWriter:
             self.db.close()
 
 if __name__ == "__main__":
-    scorer = ProductFeatureWriter()
-    scorer.update_product_features()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Score products that have no features yet.")
+    parser.add_argument("--scoring-mode", choices=ProductFeatureWriter.SCORING_MODES, default="single",
+                        help="one structured call per product, or one call per feature group")
+    parser.add_argument("--concurrency", type=int, default=8, help="products scored at once")
+    parser.add_argument("--rpm", type=float, default=DEFAULT_REQUESTS_PER_MINUTE, help="requests per minute limit")
+    parser.add_argument("--tpm", type=float, default=DEFAULT_TOKENS_PER_MINUTE, help="tokens per minute limit")
+    parser.add_argument("--base-url", help="OpenAI-compatible API base URL (default: OPENAI_BASE_URL)")
+    args = parser.parse_args()
+    scorer = ProductFeatureWriter(scoring_mode=args.scoring_mode, base_url=args.base_url)
+    scorer.update_product_features(args.concurrency, args.rpm, args.tpm)
@@ -1,6 +1,11 @@
-from typing import List, Dict, Set, Optional
+import hashlib
+from typing import List, Dict, Set, Optional, Iterator, Tuple, Union
+from psycopg2.extras import execute_values
 from config.db_config import get_db_connection
 
+# Size stored for images passed as plain bytes (see ImageProcessor.VARIANT_SIZES)
+DEFAULT_IMAGE_VARIANT = "small"
+
 class DatabaseOperationsData:
     def __init__(self):
         self.conn = None
@@ -199,21 +204,154 @@ class DatabaseOperationsData:
             return None
 
     def add_product_image(self, product_id: int, image_data: bytes, image_order: int = 0) -> bool:
+        return self.add_product_images(product_id, [image_data], start_order=image_order)
+
+    def add_product_images(self, product_id: int, images: List[Union[bytes, Dict[str, bytes]]],
+                           start_order: int = 0) -> bool:
+        """Link a product's gallery to its images, numbering image_order from *start_order*.
+
+        Each image is either bytes (stored as the default variant) or a
+        ``{variant: bytes}`` dict from ``ImageProcessor.prepare_variants``.
+        Image bytes go to image_blobs once per content hash; bytes already
+        stored (the same CDN image on several variants) are not sent again.
+        """
+        rows = []
+        for i, image in enumerate(images):
+            variants = image if isinstance(image, dict) else {DEFAULT_IMAGE_VARIANT: image}
+            rows.extend((start_order + i, variant, image_bytes) for variant, image_bytes in variants.items())
+        if not rows:
+            return True
         try:
-            self.cursor.execute(
+            hashes = self._store_image_blobs([image_bytes for _, _, image_bytes in rows])
+            execute_values(
+                self.cursor,
                 """
-                INSERT INTO product_images (product_id, image_data, image_order)
-                VALUES (%s, %s, %s)
+                INSERT INTO product_images (product_id, image_hash, image_order, variant)
+                VALUES %s
                 """,
-                (product_id, image_data, image_order)
+                [(product_id, image_hash, order, variant) for (order, variant, _), image_hash in zip(rows, hashes)],
+                page_size=len(rows)
             )
             self.commit()
             return True
         except Exception as e:
-            print(f"Error inserting product image for product_id {product_id}: {e}")
+            print(f"Error inserting product images for product_id {product_id}: {e}")
             self.rollback()
             return False
 
+    def _store_image_blobs(self, images: List[bytes]) -> List[str]:
+        hashes = [hashlib.sha256(image).hexdigest() for image in images]
+        self.cursor.execute("SELECT hash FROM image_blobs WHERE hash = ANY(%s)", (list(set(hashes)),))
+        existing = {row[0] for row in self.cursor.fetchall()}
+
+        new_blobs = {h: image for h, image in zip(hashes, images) if h not in existing}
+        if new_blobs:
+            execute_values(
+                self.cursor,
+                """
+                INSERT INTO image_blobs (hash, data, size_bytes)
+                VALUES %s
+                ON CONFLICT (hash) DO NOTHING
+                """,
+                [(h, image, len(image)) for h, image in new_blobs.items()],
+                page_size=len(new_blobs)
+            )
+        return hashes
+
+    def get_product_image_hashes(self, product_ids: List[int], variant: str = DEFAULT_IMAGE_VARIANT,
+                                 first_only: bool = False) -> Dict[int, List[str]]:
+        """Image hashes per product in gallery order, in one query for all *product_ids*.
+
+        Images without the requested *variant* fall back to another stored
+        size; with *first_only* just the main image is returned.
+        """
+        if not product_ids:
+            return {}
+        try:
+            self.cursor.execute(
+                f"""
+                SELECT DISTINCT ON (product_id{"" if first_only else ", image_order"}) product_id, image_hash
+                FROM product_images
+                WHERE product_id = ANY(%s) AND image_hash IS NOT NULL
+                ORDER BY product_id, image_order, variant <> %s, id
+                """,
+                (list(product_ids), variant)
+            )
+            hashes: Dict[int, List[str]] = {}
+            for product_id, image_hash in self.cursor.fetchall():
+                hashes.setdefault(product_id, []).append(image_hash)
+            return hashes
+        except Exception as e:
+            print(f"Error getting product image hashes: {e}")
+            self.rollback()
+            return {}
+
+    def iter_image_blobs(self, hashes: List[str], batch_size: int = 100) -> Iterator[Tuple[str, bytes]]:
+        """Yield ``(hash, bytes)`` for *hashes*, fetching *batch_size* blobs per query."""
+        hashes = list(dict.fromkeys(hashes))
+        for i in range(0, len(hashes), batch_size):
+            try:
+                self.cursor.execute(
+                    "SELECT hash, data FROM image_blobs WHERE hash = ANY(%s)", (hashes[i:i + batch_size],)
+                )
+                rows = self.cursor.fetchall()
+            except Exception as e:
+                print(f"Error reading image blobs: {e}")
+                self.rollback()
+                return
+            for blob_hash, data in rows:
+                yield blob_hash, bytes(data)
+
+    def backfill_image_blobs(self, batch_size: int = 500) -> int:
+        """Move image_data of rows written before image_blobs existed into the
+        blob table, one batch per transaction. Returns the number of rows moved."""
+        moved = 0
+        while True:
+            try:
+                self.cursor.execute("""
+                    WITH batch AS (
+                        SELECT id, encode(sha256(image_data), 'hex') AS hash, image_data
+                        FROM product_images
+                        WHERE image_hash IS NULL AND image_data IS NOT NULL
+                        ORDER BY id
+                        LIMIT %s
+                        FOR UPDATE SKIP LOCKED
+                    ),
+                    blobs AS (
+                        INSERT INTO image_blobs (hash, data, size_bytes)
+                        SELECT DISTINCT ON (hash) hash, image_data, length(image_data) FROM batch
+                        ON CONFLICT (hash) DO NOTHING
+                    )
+                    UPDATE product_images p
+                    SET image_hash = batch.hash, image_data = NULL
+                    FROM batch
+                    WHERE p.id = batch.id
+                """, (batch_size,))
+                rows = self.cursor.rowcount
+                self.commit()
+            except Exception as e:
+                print(f"Error backfilling image blobs: {e}")
+                self.rollback()
+                return moved
+            moved += rows
+            if rows < batch_size:
+                return moved
+
+    def delete_orphaned_image_blobs(self) -> int:
+        """Delete blobs no product image points to any more (e.g. after products were deleted)."""
+        try:
+            self.cursor.execute("""
+                DELETE FROM image_blobs b
+                WHERE NOT EXISTS (SELECT 1 FROM product_images p WHERE p.image_hash = b.hash)
+            """)
+            deleted = self.cursor.rowcount
+            self.commit()
+            return deleted
+        except Exception as e:
+            print(f"Error deleting orphaned image blobs: {e}")
+            self.rollback()
+            return 0
+
     def add_category_if_not_exists(self, category_name):
         try:
             self.cursor.execute("SELECT id FROM categories WHERE category_name = %s", (category_name,))
@@ -1,8 +1,13 @@
-from typing import List, Tuple, Dict
+import json
+from typing import List, Tuple, Dict, Optional
+from psycopg2.extras import execute_values
 from config.db_config import get_db_connection
 from constants import WEB_SITES
 
 class DatabaseOperationsPriceTracking:
+    # pg advisory lock key that serializes price tracking runs across processes
+    TRACKING_LOCK_KEY = 748201
+
     def __init__(self):
         self.conn = None
         self.cursor = None
@@ -24,65 +29,375 @@ class DatabaseOperationsPriceTracking:
     def rollback(self):
         self.conn.rollback()
 
-    def get_products_for_tracking(self) -> List[Tuple]:
+    def get_products_for_tracking(self, limit: Optional[int] = None) -> List[Tuple]:
+        """Products that are due for a check, most valuable first.
+
+        Products that were never checked come first; products without a
+        schedule yet are due once per day and rank above failing products.
+        Quarantined products are only returned when their slow re-probe is due.
+        """
         try:
             self.cursor.execute("""
                 SELECT p.id, p.link, p.price, p.site 
                 FROM product p
-                WHERE NOT EXISTS (
-                    SELECT 1 FROM price_changes pc 
-                    WHERE pc.product_id = p.id 
-                    AND pc.created_date = CURRENT_DATE
+                LEFT JOIN price_tracking_state s ON s.product_id = p.id
+                WHERE (
+                    s.product_id IS NULL
+                    OR (s.next_check_at IS NOT NULL AND s.next_check_at <= NOW())
+                    OR (s.next_check_at IS NULL AND (s.last_checked_at IS NULL OR s.last_checked_at < CURRENT_DATE))
                 )
+                AND (s.quarantined_at IS NULL OR s.next_check_at <= NOW())
                 AND p.site = ANY(%s)
-            """, (list(WEB_SITES.keys()),))
+                ORDER BY (s.product_id IS NULL) DESC, COALESCE(s.priority, 0) DESC, s.next_check_at ASC NULLS FIRST, p.id
+                LIMIT %s
+            """, (list(WEB_SITES.keys()), limit))
             return self.cursor.fetchall()
         except Exception as e:
             print(f"Error getting products for tracking: {e}")
             return []
 
+    def get_price_change_stats(self, product_ids: List[int]) -> Dict[int, Dict]:
+        """Per-product change history used by the price check scheduler."""
+        if not product_ids:
+            return {}
+        try:
+            self.cursor.execute("""
+                SELECT
+                    s.product_id,
+                    COUNT(pc.product_id) FILTER (
+                        WHERE pc.created_date >= CURRENT_DATE - INTERVAL '29 days'
+                    ) AS changes_30_days,
+                    MAX(pc.created_date) AS last_change_date,
+                    s.min_7_days,
+                    s.min_30_days
+                FROM price_tracking_state s
+                LEFT JOIN price_changes pc ON pc.product_id = s.product_id
+                WHERE s.product_id = ANY(%s)
+                GROUP BY s.product_id, s.min_7_days, s.min_30_days
+            """, (list(product_ids),))
+            return {
+                row[0]: {
+                    'changes_30_days': row[1],
+                    'last_change_date': row[2],
+                    'min_7_days': row[3],
+                    'min_30_days': row[4]
+                }
+                for row in self.cursor.fetchall()
+            }
+        except Exception as e:
+            print(f"Error getting price change stats: {e}")
+            self.rollback()
+            return {}
+
+    def schedule_next_checks(self, schedule: List[Tuple[int, float, float]]) -> bool:
+        """Store (product_id, hours until next check, priority) for each product."""
+        if not schedule:
+            return True
+        try:
+            execute_values(
+                self.cursor,
+                """
+                UPDATE price_tracking_state s
+                SET
+                    next_check_at = NOW() + v.interval_hours * INTERVAL '1 hour',
+                    priority = v.priority
+                FROM (VALUES %s) AS v (product_id, interval_hours, priority)
+                WHERE s.product_id = v.product_id
+                """,
+                schedule,
+                template="(%s::integer, %s::double precision, %s::double precision)",
+                page_size=len(schedule),
+            )
+            self.commit()
+            return True
+        except Exception as e:
+            print(f"Error scheduling next price checks: {e}")
+            self.rollback()
+            return False
+
     def record_price_change(self, product_id: int, old_price: float, new_price: float) -> bool:
+        return self.record_price_changes_batch([(product_id, old_price, new_price)])
+
+    def record_price_changes_batch(self, results: List[Tuple[int, float, float]]) -> bool:
+        """Record many (product_id, old_price, new_price) results in one transaction.
+
+        Every product is marked as checked in price_tracking_state, but only
+        real changes are inserted into price_changes, using a single multi-row
+        INSERT. Each price is folded into today's price_daily_minima bucket and
+        the rolling 7/30-day minima on the state row, and one set-based UPDATE
+        sets price and the low-price flags for every product in the batch.
+        """
+        if not results:
+            return True
+        try:
+            changes = [
+                (product_id, old_price, new_price)
+                for product_id, old_price, new_price in results
+                if old_price is None or old_price != new_price
+            ]
+            if changes:
+                execute_values(
+                    self.cursor,
+                    "INSERT INTO price_changes (product_id, old_price, new_price) VALUES %s",
+                    [(product_id, old_price if old_price is not None else new_price, new_price)
+                     for product_id, old_price, new_price in changes],
+                    page_size=len(changes),
+                )
+
+            # Last result wins if a product shows up twice in the same batch
+            latest = list({
+                product_id: (product_id, old_price, new_price)
+                for product_id, old_price, new_price in results
+            }.values())
+
+            # The old price was in effect until now, so it counts towards today's minimum
+            execute_values(
+                self.cursor,
+                """
+                INSERT INTO price_daily_minima (product_id, day, min_price)
+                VALUES %s
+                ON CONFLICT (product_id, day) DO UPDATE SET
+                    min_price = LEAST(price_daily_minima.min_price, EXCLUDED.min_price)
+                """,
+                latest,
+                template="(%s, CURRENT_DATE, LEAST(%s::numeric, %s::numeric))",
+                page_size=len(latest),
+            )
+
+            # Rolling minima are kept on the state row and only ever lowered here;
+            # expire_price_windows() rebuilds them when days leave the windows.
+            # The flags then come straight from the upserted row.
+            execute_values(
+                self.cursor,
+                """
+                WITH batch (product_id, old_price, new_price) AS (
+                    VALUES %s
+                ),
+                upserted AS (
+                    INSERT INTO price_tracking_state (
+                        product_id, last_checked_at, last_price, consecutive_failures, min_7_days, min_30_days
+                    )
+                    SELECT product_id, NOW(), new_price, 0, LEAST(old_price, new_price), LEAST(old_price, new_price)
+                    FROM batch
+                    ON CONFLICT (product_id) DO UPDATE SET
+                        last_checked_at = EXCLUDED.last_checked_at,
+                        last_price = EXCLUDED.last_price,
+                        consecutive_failures = 0,
+                        quarantined_at = NULL,
+                        min_7_days = LEAST(price_tracking_state.min_7_days, EXCLUDED.min_7_days),
+                        min_30_days = LEAST(price_tracking_state.min_30_days, EXCLUDED.min_30_days)
+                    RETURNING product_id, last_price, min_7_days, min_30_days
+                )
+                UPDATE product p
+                SET
+                    price = u.last_price,
+                    is_last_7_days_lower_price = (u.last_price <= u.min_7_days),
+                    is_last_30_days_lower_price = (u.last_price <= u.min_30_days)
+                FROM upserted u
+                WHERE p.id = u.product_id
+                """,
+                latest,
+                template="(%s::integer, %s::numeric, %s::numeric)",
+                page_size=len(latest),
+            )
+            self.commit()
+            return True
+        except Exception as e:
+            print(f"Error recording price change batch of {len(results)} products: {e}")
+            self.rollback()
+            return False
+
+    def expire_price_windows(self) -> bool:
+        """Nightly job: drop days that left the 30-day window and rebuild the
+        rolling minima and low-price flags from what is left."""
         try:
             self.cursor.execute("""
-                INSERT INTO price_changes (product_id, old_price, new_price)
-                VALUES (%s, %s, %s)
-            """, (product_id, old_price, new_price))
+                DELETE FROM price_daily_minima
+                WHERE day < CURRENT_DATE - INTERVAL '29 days'
+            """)
+            self.cursor.execute("""
+                UPDATE price_tracking_state s
+                SET
+                    min_7_days = m.min_7_days,
+                    min_30_days = m.min_30_days
+                FROM (
+                    SELECT
+                        s2.product_id,
+                        MIN(d.min_price) FILTER (WHERE d.day >= CURRENT_DATE - INTERVAL '6 days') AS min_7_days,
+                        MIN(d.min_price) AS min_30_days
+                    FROM price_tracking_state s2
+                    LEFT JOIN price_daily_minima d ON d.product_id = s2.product_id
+                    GROUP BY s2.product_id
+                ) m
+                WHERE s.product_id = m.product_id
+                  AND (s.min_7_days IS DISTINCT FROM m.min_7_days OR s.min_30_days IS DISTINCT FROM m.min_30_days)
+            """)
+            self.cursor.execute("""
+                UPDATE product p
+                SET
+                    is_last_7_days_lower_price = (s.last_price <= COALESCE(s.min_7_days, s.last_price)),
+                    is_last_30_days_lower_price = (s.last_price <= COALESCE(s.min_30_days, s.last_price))
+                FROM price_tracking_state s
+                WHERE p.id = s.product_id
+                  AND s.last_price IS NOT NULL
+                  AND (
+                      p.is_last_7_days_lower_price IS DISTINCT FROM (s.last_price <= COALESCE(s.min_7_days, s.last_price))
+                      OR p.is_last_30_days_lower_price IS DISTINCT FROM (s.last_price <= COALESCE(s.min_30_days, s.last_price))
+                  )
+            """)
+            self.commit()
+            return True
+        except Exception as e:
+            print(f"Error expiring price windows: {e}")
+            self.rollback()
+            return False
 
-            update_query = """
-                UPDATE product
+    def record_tracking_failures(self, failures: List[Tuple[int, str]], backoff_hours: float = 6,
+                                 max_backoff_hours: float = 72, quarantine_after: int = 5,
+                                 reprobe_hours: float = 7 * 24, failure_priority: float = -1.0) -> bool:
+        """Count a failed check for each (product_id, reason) and push its next check back.
+
+        The retry delay doubles with every consecutive failure, starting at
+        *backoff_hours* and capped at *max_backoff_hours*. From
+        *quarantine_after* failures on the product is quarantined and only
+        re-probed every *reprobe_hours*; a successful check releases it.
+        Failing products drop to *failure_priority*, below every scheduled
+        product, until a successful check gives them a real priority again.
+        """
+        if not failures:
+            return True
+        latest = list({product_id: (product_id, reason) for product_id, reason in failures}.values())
+        try:
+            execute_values(
+                self.cursor,
+                """
+                INSERT INTO price_tracking_state (
+                    product_id, consecutive_failures, last_failed_at, last_failure_reason, priority
+                )
+                VALUES %s
+                ON CONFLICT (product_id) DO UPDATE SET
+                    consecutive_failures = price_tracking_state.consecutive_failures + 1,
+                    last_failed_at = EXCLUDED.last_failed_at,
+                    last_failure_reason = EXCLUDED.last_failure_reason,
+                    priority = EXCLUDED.priority
+                """,
+                [(product_id, reason, failure_priority) for product_id, reason in latest],
+                template="(%s, 1, NOW(), %s, %s)",
+                page_size=len(latest),
+            )
+            self.cursor.execute("""
+                UPDATE price_tracking_state
                 SET
-                    price = %s,
-                    is_last_7_days_lower_price = (%s <= COALESCE((
-                        SELECT MIN(pc.new_price)
-                        FROM price_changes pc
-                        WHERE pc.product_id = %s
-                          AND pc.created_date >= CURRENT_DATE - INTERVAL '6 days'
-                    ), %s)),
-                    is_last_30_days_lower_price = (%s <= COALESCE((
-                        SELECT MIN(pc.new_price)
-                        FROM price_changes pc
-                        WHERE pc.product_id = %s
-                          AND pc.created_date >= CURRENT_DATE - INTERVAL '29 days'
-                    ), %s))
-                WHERE id = %s
-            """
-            params = (new_price, new_price, product_id, new_price, new_price, product_id, new_price, product_id)
-            self.cursor.execute(update_query, params)
+                    quarantined_at = CASE
+                        WHEN consecutive_failures >= %(quarantine_after)s THEN COALESCE(quarantined_at, NOW())
+                    END,
+                    next_check_at = NOW() + CASE
+                        WHEN consecutive_failures >= %(quarantine_after)s THEN %(reprobe_hours)s
+                        ELSE LEAST(%(backoff_hours)s * POWER(2, consecutive_failures - 1), %(max_backoff_hours)s)
+                    END * INTERVAL '1 hour'
+                WHERE product_id = ANY(%(product_ids)s)
+            """, {
+                "quarantine_after": quarantine_after,
+                "reprobe_hours": reprobe_hours,
+                "backoff_hours": backoff_hours,
+                "max_backoff_hours": max_backoff_hours,
+                "product_ids": [product_id for product_id, _ in latest],
+            })
+            self.commit()
+            return True
+        except Exception as e:
+            print(f"Error recording tracking failures: {e}")
+            self.rollback()
+            return False
+
+    def get_quarantined_products(self) -> List[Dict]:
+        try:
+            self.cursor.execute("""
+                SELECT
+                    p.id, p.product_name, p.link, p.site, s.consecutive_failures,
+                    s.last_failure_reason, s.last_failed_at, s.quarantined_at, s.next_check_at
+                FROM price_tracking_state s
+                JOIN product p ON p.id = s.product_id
+                WHERE s.quarantined_at IS NOT NULL
+                ORDER BY s.quarantined_at DESC
+            """)
+            columns = [
+                'id', 'product_name', 'link', 'site', 'consecutive_failures',
+                'last_failure_reason', 'last_failed_at', 'quarantined_at', 'next_check_at'
+            ]
+            return [dict(zip(columns, row)) for row in self.cursor.fetchall()]
+        except Exception as e:
+            print(f"Error getting quarantined products: {e}")
+            self.rollback()
+            return []
+
+    def release_from_quarantine(self, product_ids: List[int]) -> bool:
+        """Clear the failure history (and the failure priority) so the products are checked on the next run."""
+        if not product_ids:
+            return True
+        try:
+            self.cursor.execute("""
+                UPDATE price_tracking_state
+                SET quarantined_at = NULL, consecutive_failures = 0, next_check_at = NOW(), priority = NULL
+                WHERE product_id = ANY(%s)
+            """, (list(product_ids),))
             self.commit()
             return True
         except Exception as e:
-            print(f"Error recording price change for product {product_id}: {e}")
+            print(f"Error releasing products from quarantine: {e}")
             self.rollback()
             return False
 
+    def reprobe_now(self, product_ids: List[int]) -> bool:
+        """Make quarantined products due on the next run without clearing their failure count."""
+        if not product_ids:
+            return True
+        try:
+            self.cursor.execute(
+                "UPDATE price_tracking_state SET next_check_at = NOW() WHERE product_id = ANY(%s)",
+                (list(product_ids),)
+            )
+            self.commit()
+            return True
+        except Exception as e:
+            print(f"Error scheduling re-probe: {e}")
+            self.rollback()
+            return False
+
+    def get_tracking_state(self, product_id: int) -> Optional[Dict]:
+        try:
+            self.cursor.execute("""
+                SELECT last_checked_at, last_price, consecutive_failures, last_failed_at
+                FROM price_tracking_state
+                WHERE product_id = %s
+            """, (product_id,))
+            row = self.cursor.fetchone()
+            if not row:
+                return None
+            return {
+                'last_checked_at': row[0],
+                'last_price': row[1],
+                'consecutive_failures': row[2],
+                'last_failed_at': row[3]
+            }
+        except Exception as e:
+            print(f"Error getting tracking state: {e}")
+            return None
+
     def get_price_history(self, product_id: int) -> List[Dict]:
+        """Price change events, with compacted periods reported at their start
+        date (previous price of the period's first change, last price of the period)."""
         try:
             self.cursor.execute("""
                 SELECT created_date, old_price, new_price
                 FROM price_changes
                 WHERE product_id = %s
-                ORDER BY created_date DESC
-            """, (product_id,))
+                UNION ALL
+                SELECT period_start, first_old_price, last_price
+                FROM price_changes_rollup
+                WHERE product_id = %s
+                ORDER BY 1 DESC
+            """, (product_id, product_id))
             
             return [
                 {
@@ -99,9 +414,9 @@ class DatabaseOperationsPriceTracking:
     def get_today_tracked_count(self) -> int:
         try:
             self.cursor.execute("""
-                SELECT COUNT(DISTINCT product_id)
-                FROM price_changes
-                WHERE created_date = CURRENT_DATE
+                SELECT COUNT(*)
+                FROM price_tracking_state
+                WHERE last_checked_at >= CURRENT_DATE
             """)
             return self.cursor.fetchone()[0]
         except Exception as e:
@@ -117,9 +432,303 @@ class DatabaseOperationsPriceTracking:
                     SELECT 1 FROM price_changes pc 
                     WHERE pc.product_id = p.id
                 )
+                OR EXISTS (
+                    SELECT 1 FROM price_changes_rollup r
+                    WHERE r.product_id = p.id
+                )
                 ORDER BY p.product_name
             """)
             return self.cursor.fetchall()
         except Exception as e:
             print(f"Error getting products with price changes: {e}")
             return []
+
+    def try_acquire_tracking_lock(self) -> bool:
+        """Take the session-level lock that allows only one tracking run at a time."""
+        try:
+            self.cursor.execute("SELECT pg_try_advisory_lock(%s)", (self.TRACKING_LOCK_KEY,))
+            acquired = self.cursor.fetchone()[0]
+            self.commit()
+            return acquired
+        except Exception as e:
+            print(f"Error acquiring price tracking lock: {e}")
+            self.rollback()
+            return False
+
+    def release_tracking_lock(self):
+        try:
+            self.cursor.execute("SELECT pg_advisory_unlock(%s)", (self.TRACKING_LOCK_KEY,))
+            self.commit()
+        except Exception as e:
+            print(f"Error releasing price tracking lock: {e}")
+            self.rollback()
+
+    def is_tracking_running(self) -> bool:
+        try:
+            self.cursor.execute("""
+                SELECT EXISTS (
+                    SELECT 1 FROM pg_locks
+                    WHERE locktype = 'advisory'
+                      AND classid = 0
+                      AND objid = %s
+                      AND granted
+                )
+            """, (self.TRACKING_LOCK_KEY,))
+            return self.cursor.fetchone()[0]
+        except Exception as e:
+            print(f"Error checking price tracking lock: {e}")
+            self.rollback()
+            return False
+
+    def create_tracking_job(self, host: str, pid: int) -> Optional[int]:
+        """Start a job row. Only call while holding the tracking lock: any job
+        still marked running at that point belongs to a run that died."""
+        try:
+            self.cursor.execute("""
+                UPDATE price_tracking_jobs
+                SET status = 'interrupted', finished_at = heartbeat_at
+                WHERE status = 'running'
+            """)
+            self.cursor.execute("""
+                INSERT INTO price_tracking_jobs (host, pid)
+                VALUES (%s, %s) RETURNING id
+            """, (host, pid))
+            job_id = self.cursor.fetchone()[0]
+            self.commit()
+            return job_id
+        except Exception as e:
+            print(f"Error creating price tracking job: {e}")
+            self.rollback()
+            return None
+
+    def update_tracking_job(self, job_id: int, stats: Dict) -> bool:
+        try:
+            self.cursor.execute("""
+                UPDATE price_tracking_jobs
+                SET
+                    heartbeat_at = NOW(),
+                    total = %s,
+                    processed = %s,
+                    updated = %s,
+                    unchanged = %s,
+                    failed = %s
+                WHERE id = %s
+            """, (
+                stats.get("total", 0), stats.get("processed", 0), stats.get("updated", 0),
+                stats.get("unchanged", 0), stats.get("failed", 0), job_id
+            ))
+            self.commit()
+            return True
+        except Exception as e:
+            print(f"Error updating price tracking job {job_id}: {e}")
+            self.rollback()
+            return False
+
+    def finish_tracking_job(self, job_id: int, status: str, stats: Dict, message: Optional[str] = None) -> bool:
+        try:
+            self.cursor.execute("""
+                UPDATE price_tracking_jobs
+                SET
+                    status = %s,
+                    finished_at = NOW(),
+                    heartbeat_at = NOW(),
+                    total = %s,
+                    processed = %s,
+                    updated = %s,
+                    unchanged = %s,
+                    failed = %s,
+                    stats = %s,
+                    message = %s
+                WHERE id = %s
+            """, (
+                status, stats.get("total", 0), stats.get("processed", 0), stats.get("updated", 0),
+                stats.get("unchanged", 0), stats.get("failed", 0), json.dumps(stats), message, job_id
+            ))
+            self.commit()
+            return True
+        except Exception as e:
+            print(f"Error finishing price tracking job {job_id}: {e}")
+            self.rollback()
+            return False
+
+    def get_recent_tracking_jobs(self, limit: int = 10) -> List[Dict]:
+        try:
+            self.cursor.execute("""
+                SELECT id, status, started_at, heartbeat_at, finished_at,
+                       total, processed, updated, unchanged, failed, stats, message, host, pid
+                FROM price_tracking_jobs
+                ORDER BY id DESC
+                LIMIT %s
+            """, (limit,))
+            columns = [
+                'id', 'status', 'started_at', 'heartbeat_at', 'finished_at',
+                'total', 'processed', 'updated', 'unchanged', 'failed', 'stats', 'message', 'host', 'pid'
+            ]
+            return [dict(zip(columns, row)) for row in self.cursor.fetchall()]
+        except Exception as e:
+            print(f"Error getting price tracking jobs: {e}")
+            return []
+
+    def ensure_price_change_partitions(self, months_ahead: int = 2) -> bool:
+        try:
+            self.cursor.execute("SELECT ensure_price_changes_partitions(%s)", (months_ahead,))
+            self.commit()
+            return True
+        except Exception as e:
+            print(f"Error creating price_changes partitions: {e}")
+            self.rollback()
+            return False
+
+    def compact_price_changes(self, weekly_after_days: int = 90, monthly_after_days: int = 365) -> Tuple[int, int]:
+        """Roll raw price_changes older than *weekly_after_days* into weekly
+        min/max/last rows, and weekly rows older than *monthly_after_days* into
+        monthly ones. Cutoffs are aligned to week/month starts so only complete
+        periods are compacted; a week that straddles two months is merged into
+        the month it starts in. Returns (raw rows compacted, weekly rows merged)."""
+        try:
+            self.cursor.execute("""
+                WITH compacted AS (
+                    DELETE FROM price_changes
+                    WHERE created_date < date_trunc('week', CURRENT_DATE - %s * INTERVAL '1 day')::date
+                    RETURNING id, product_id, old_price, new_price, created_date
+                ),
+                rolled_up AS (
+                    INSERT INTO price_changes_rollup (
+                        product_id, period, period_start, min_price, max_price, first_old_price, last_price, change_count
+                    )
+                    SELECT
+                        product_id,
+                        'week',
+                        date_trunc('week', created_date)::date,
+                        MIN(LEAST(old_price, new_price)),
+                        MAX(GREATEST(old_price, new_price)),
+                        (array_agg(old_price ORDER BY created_date, id))[1],
+                        (array_agg(new_price ORDER BY created_date DESC, id DESC))[1],
+                        COUNT(*)
+                    FROM compacted
+                    GROUP BY product_id, date_trunc('week', created_date)
+                    ON CONFLICT (product_id, period, period_start) DO UPDATE SET
+                        min_price = LEAST(price_changes_rollup.min_price, EXCLUDED.min_price),
+                        max_price = GREATEST(price_changes_rollup.max_price, EXCLUDED.max_price),
+                        last_price = EXCLUDED.last_price,
+                        change_count = price_changes_rollup.change_count + EXCLUDED.change_count
+                )
+                SELECT COUNT(*) FROM compacted
+            """, (weekly_after_days,))
+            raw_rows = self.cursor.fetchone()[0]
+
+            self.cursor.execute("""
+                WITH merged AS (
+                    DELETE FROM price_changes_rollup
+                    WHERE period = 'week'
+                      AND period_start < date_trunc('month', CURRENT_DATE - %s * INTERVAL '1 day')::date
+                    RETURNING *
+                ),
+                rolled_up AS (
+                    INSERT INTO price_changes_rollup (
+                        product_id, period, period_start, min_price, max_price, first_old_price, last_price, change_count
+                    )
+                    SELECT
+                        product_id,
+                        'month',
+                        date_trunc('month', period_start)::date,
+                        MIN(min_price),
+                        MAX(max_price),
+                        (array_agg(first_old_price ORDER BY period_start))[1],
+                        (array_agg(last_price ORDER BY period_start DESC))[1],
+                        SUM(change_count)
+                    FROM merged
+                    GROUP BY product_id, date_trunc('month', period_start)
+                    ON CONFLICT (product_id, period, period_start) DO UPDATE SET
+                        min_price = LEAST(price_changes_rollup.min_price, EXCLUDED.min_price),
+                        max_price = GREATEST(price_changes_rollup.max_price, EXCLUDED.max_price),
+                        last_price = EXCLUDED.last_price,
+                        change_count = price_changes_rollup.change_count + EXCLUDED.change_count
+                )
+                SELECT COUNT(*) FROM merged
+            """, (monthly_after_days,))
+            weekly_rows = self.cursor.fetchone()[0]
+
+            self.commit()
+            return raw_rows, weekly_rows
+        except Exception as e:
+            print(f"Error compacting price changes: {e}")
+            self.rollback()
+            return 0, 0
+
+    def drop_empty_price_change_partitions(self) -> List[str]:
+        """Drop monthly partitions that compaction has emptied, excluding the
+        current month and anything ahead of it."""
+        dropped = []
+        try:
+            self.cursor.execute("""
+                SELECT c.relname
+                FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = 'price_changes'::regclass
+                  AND c.relname ~ '^price_changes_[0-9]{4}_[0-9]{2}$'
+                  AND to_date(substring(c.relname from 15), 'YYYY_MM') < date_trunc('month', CURRENT_DATE)
+                ORDER BY c.relname
+            """)
+            for (partition_name,) in self.cursor.fetchall():
+                self.cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {partition_name})")
+                if not self.cursor.fetchone()[0]:
+                    self.cursor.execute(f"DROP TABLE {partition_name}")
+                    dropped.append(partition_name)
+            self.commit()
+            return dropped
+        except Exception as e:
+            print(f"Error dropping empty price_changes partitions: {e}")
+            self.rollback()
+            return []
+
+    def is_price_changes_partitioned(self) -> bool:
+        self.cursor.execute("SELECT relkind FROM pg_class WHERE oid = 'price_changes'::regclass")
+        return self.cursor.fetchone()[0] == 'p'
+
+    def migrate_price_changes_to_partitioned(self, table_sql_path: str) -> bool:
+        """Move an unpartitioned price_changes table into the partitioned layout
+        defined in *table_sql_path*, keeping ids."""
+        try:
+            if self.is_price_changes_partitioned():
+                print("price_changes is already partitioned.")
+                return True
+
+            with open(table_sql_path, 'r') as file:
+                create_table_query = file.read()
+
+            self.cursor.execute("ALTER TABLE price_changes RENAME TO price_changes_legacy")
+            self.cursor.execute("""
+                ALTER INDEX IF EXISTS idx_price_changes_product_id_created_date
+                RENAME TO idx_price_changes_legacy_product_id_created_date
+            """)
+            self.cursor.execute("""
+                ALTER INDEX IF EXISTS idx_price_changes_created_date
+                RENAME TO idx_price_changes_legacy_created_date
+            """)
+            self.cursor.execute(create_table_query)
+
+            self.cursor.execute("SELECT MIN(created_date) FROM price_changes_legacy")
+            oldest = self.cursor.fetchone()[0]
+            if oldest:
+                self.cursor.execute("SELECT ensure_price_changes_partitions(2, %s)", (oldest,))
+
+            self.cursor.execute("""
+                INSERT INTO price_changes (id, product_id, old_price, new_price, created_date)
+                SELECT id, product_id, old_price, new_price, created_date
+                FROM price_changes_legacy
+            """)
+            self.cursor.execute("""
+                SELECT setval(
+                    pg_get_serial_sequence('price_changes', 'id'),
+                    COALESCE((SELECT MAX(id) FROM price_changes), 0) + 1,
+                    false
+                )
+            """)
+            self.cursor.execute("DROP TABLE price_changes_legacy")
+            self.commit()
+            return True
+        except Exception as e:
+            print(f"Error migrating price_changes to partitions: {e}")
+            self.rollback()
+            return False
@@ -0,0 +1,75 @@
+from typing import Dict, List, Optional
+from psycopg2.extras import execute_values
+from config.db_config import get_db_connection
+
+class DatabaseOperationsScrapeMetrics:
+    def __init__(self):
+        self.conn = None
+        self.cursor = None
+        self.connect()
+
+    def connect(self):
+        self.conn = get_db_connection()
+        self.cursor = self.conn.cursor()
+
+    def close(self):
+        if self.cursor:
+            self.cursor.close()
+        if self.conn:
+            self.conn.close()
+
+    def commit(self):
+        self.conn.commit()
+
+    def rollback(self):
+        self.conn.rollback()
+
+    def record_phase_stats(self, source: str, phases: Dict[str, Dict], job_id: Optional[int] = None) -> bool:
+        """Store one row per phase from a ``PhaseStats.to_dict()`` snapshot."""
+        if not phases:
+            return True
+        try:
+            rows = [
+                (source, job_id, phase, entry["count"], entry["total_seconds"], entry["max_seconds"], entry["histogram"])
+                for phase, entry in phases.items()
+            ]
+            execute_values(
+                self.cursor,
+                """
+                INSERT INTO scrape_phase_metrics (source, job_id, phase, count, total_seconds, max_seconds, histogram)
+                VALUES %s
+                """,
+                rows,
+                page_size=len(rows)
+            )
+            self.commit()
+            return True
+        except Exception as e:
+            print(f"Error recording scrape phase metrics: {e}")
+            self.rollback()
+            return False
+
+    def get_phase_trends(self, days: int = 30, source: Optional[str] = None) -> List[Dict]:
+        """Mean milliseconds per phase per day over the last *days* days."""
+        try:
+            self.cursor.execute("""
+                SELECT
+                    recorded_at::date AS day,
+                    phase,
+                    SUM(count) AS count,
+                    SUM(total_seconds) * 1000 / NULLIF(SUM(count), 0) AS mean_ms,
+                    MAX(max_seconds) * 1000 AS max_ms
+                FROM scrape_phase_metrics
+                WHERE recorded_at >= CURRENT_DATE - %s * INTERVAL '1 day'
+                  AND (%s IS NULL OR source = %s)
+                GROUP BY day, phase
+                ORDER BY day, phase
+            """, (days, source, source))
+            return [
+                {"day": row[0], "phase": row[1], "count": int(row[2]), "mean_ms": float(row[3] or 0), "max_ms": float(row[4] or 0)}
+                for row in self.cursor.fetchall()
+            ]
+        except Exception as e:
+            print(f"Error fetching scrape phase trends: {e}")
+            self.rollback()
+            return []
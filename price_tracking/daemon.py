@@ -0,0 +1,150 @@
+"""Headless price tracking runner.
+
+Run from the repository root:
+
+    python -m price_tracking.daemon --once           # single run, then exit
+    python -m price_tracking.daemon --at 03:00       # run every day at 03:00
+
+Only one run can be active at a time (a Postgres advisory lock is held for
+the duration of a run). Progress is checkpointed into price_tracking_jobs and
+price_tracking_state, so an interrupted run is resumed by the next one.
+"""
+import argparse
+import os
+import signal
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from db_operations.dbop_price_tracking import DatabaseOperationsPriceTracking
+from price_tracking.price_tracking import PriceTracker
+from price_tracking.maintenance import PriceHistoryMaintenance
+from db_operations.dbop_scrape_metrics import DatabaseOperationsScrapeMetrics
+
+class PriceTrackingDaemon:
+    def __init__(self, tracker_kwargs: Optional[Dict] = None, heartbeat_seconds: float = 10,
+                 record_metrics: bool = True):
+        self.tracker_kwargs = tracker_kwargs or {}
+        self.heartbeat_seconds = heartbeat_seconds
+        self.record_metrics = record_metrics
+        self.stop_event = threading.Event()
+
+    def run_once(self) -> Optional[Dict]:
+        jobs_db = DatabaseOperationsPriceTracking()
+        try:
+            if not jobs_db.try_acquire_tracking_lock():
+                print("Another price tracking run is in progress, skipping.")
+                return None
+
+            # Nightly maintenance: partitions, 7/30-day windows and history compaction
+            PriceHistoryMaintenance(jobs_db).run_nightly()
+
+            job_id = jobs_db.create_tracking_job(socket.gethostname(), os.getpid())
+            if job_id is None:
+                return None
+            print(f"Started price tracking job {job_id}")
+
+            last_heartbeat = 0.0
+
+            def on_progress(event: Dict):
+                nonlocal last_heartbeat
+                if event["type"] == "started":
+                    jobs_db.update_tracking_job(job_id, {"total": event["total"]})
+                    print(f"Total products to check: {event['total']}")
+                elif event["type"] == "checkpoint" or (
+                    event["type"] == "progress" and time.monotonic() - last_heartbeat >= self.heartbeat_seconds
+                ):
+                    jobs_db.update_tracking_job(job_id, event["stats"])
+                    last_heartbeat = time.monotonic()
+
+            status, message, stats = "failed", None, {}
+            try:
+                stats = PriceTracker(**self.tracker_kwargs).track_prices(on_progress, self.stop_event)
+                status = "interrupted" if self.stop_event.is_set() else "completed"
+            except Exception as e:
+                message = str(e)
+                print(f"Price tracking job {job_id} failed: {e}")
+            finally:
+                jobs_db.finish_tracking_job(job_id, status, stats, message)
+
+            if self.record_metrics and stats.get("phases"):
+                metrics_db = DatabaseOperationsScrapeMetrics()
+                try:
+                    metrics_db.record_phase_stats("price_tracking", stats["phases"], job_id)
+                finally:
+                    metrics_db.close()
+
+            print(f"Price tracking job {job_id} {status}: {stats}")
+            return stats
+        finally:
+            jobs_db.release_tracking_lock()
+            jobs_db.close()
+
+    def run_daily(self, at: str):
+        hour, minute = (int(part) for part in at.split(":"))
+
+        # Pick up where an interrupted or crashed run left off before waiting for the schedule
+        if self._last_run_unfinished():
+            print("Resuming unfinished price tracking run")
+            self.run_once()
+
+        while not self.stop_event.is_set():
+            next_run = self._next_run_time(hour, minute)
+            print(f"Next price tracking run at {next_run:%Y-%m-%d %H:%M}")
+            if self.stop_event.wait((next_run - datetime.now()).total_seconds()):
+                break
+            self.run_once()
+
+    def stop(self, *_):
+        print("Stopping price tracking after the current products...")
+        self.stop_event.set()
+
+    @staticmethod
+    def _next_run_time(hour: int, minute: int) -> datetime:
+        now = datetime.now()
+        next_run = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if next_run <= now:
+            next_run += timedelta(days=1)
+        return next_run
+
+    @staticmethod
+    def _last_run_unfinished() -> bool:
+        db = DatabaseOperationsPriceTracking()
+        try:
+            jobs = db.get_recent_tracking_jobs(limit=1)
+            return bool(jobs) and jobs[0]["status"] in ("running", "interrupted", "failed")
+        finally:
+            db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Run price tracking without the Streamlit UI.")
+    parser.add_argument("--once", action="store_true", help="run a single tracking pass and exit")
+    parser.add_argument("--at", default="03:00", help="daily run time (HH:MM) when not using --once")
+    parser.add_argument("--workers", type=int, default=2, help="scraper workers per site")
+    parser.add_argument("--flush-every", type=int, default=200, help="products per database batch")
+    parser.add_argument("--no-http", action="store_true", help="always use the browser instead of the HTTP fast path")
+    parser.add_argument("--no-cache", action="store_true", help="always fetch pages instead of reusing recently scraped prices")
+    parser.add_argument("--no-listings", action="store_true", help="skip the listing pages in listing_pages.txt")
+    parser.add_argument("--no-metrics", action="store_true", help="do not store per-phase scraper timings")
+    parser.add_argument("--daily-budget", type=int, default=None, help="maximum product checks per day")
+    args = parser.parse_args()
+
+    daemon = PriceTrackingDaemon(tracker_kwargs={
+        "workers": args.workers,
+        "flush_every": args.flush_every,
+        "use_http": not args.no_http,
+        "daily_budget": args.daily_budget,
+        "use_cache": not args.no_cache,
+        "listing_urls": [] if args.no_listings else None,
+    }, record_metrics=not args.no_metrics)
+    signal.signal(signal.SIGINT, daemon.stop)
+    signal.signal(signal.SIGTERM, daemon.stop)
+
+    if args.once:
+        daemon.run_once()
+    else:
+        daemon.run_daily(args.at)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Price history maintenance.
+
+Run from the repository root:
+
+    python -m price_tracking.maintenance             # nightly jobs
+    python -m price_tracking.maintenance --migrate   # convert an old unpartitioned price_changes table
+"""
+import argparse
+from typing import Dict
+from db_operations.dbop_price_tracking import DatabaseOperationsPriceTracking
+
+PRICE_CHANGES_SQL = "table_executor/all_tables/8_price_changes.sql"
+
+class PriceHistoryMaintenance:
+    # Raw rows must outlive the 30-day windows that the tracker and scheduler read
+    MIN_RAW_RETENTION_DAYS = 30
+
+    def __init__(self, db: DatabaseOperationsPriceTracking, weekly_after_days: int = 90,
+                 monthly_after_days: int = 365, months_ahead: int = 2):
+        self.db = db
+        self.weekly_after_days = max(weekly_after_days, self.MIN_RAW_RETENTION_DAYS)
+        self.monthly_after_days = max(monthly_after_days, self.weekly_after_days)
+        self.months_ahead = months_ahead
+
+    def run_nightly(self) -> Dict:
+        self.db.ensure_price_change_partitions(self.months_ahead)
+        self.db.expire_price_windows()
+        raw_rows, weekly_rows = self.db.compact_price_changes(self.weekly_after_days, self.monthly_after_days)
+        dropped = self.db.drop_empty_price_change_partitions()
+
+        result = {"compacted_rows": raw_rows, "merged_weekly_rows": weekly_rows, "dropped_partitions": dropped}
+        print(f"Price history maintenance: {result}")
+        return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Price history maintenance jobs.")
+    parser.add_argument("--migrate", action="store_true", help="move price_changes into monthly partitions")
+    parser.add_argument("--weekly-after-days", type=int, default=90, help="roll raw rows up per week after this many days")
+    parser.add_argument("--monthly-after-days", type=int, default=365, help="roll weekly rows up per month after this many days")
+    args = parser.parse_args()
+
+    db = DatabaseOperationsPriceTracking()
+    try:
+        if args.migrate:
+            if db.migrate_price_changes_to_partitioned(PRICE_CHANGES_SQL):
+                print("price_changes is partitioned.")
+            return
+        PriceHistoryMaintenance(db, args.weekly_after_days, args.monthly_after_days).run_nightly()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
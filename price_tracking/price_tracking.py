@@ -1,72 +1,269 @@
-from datetime import datetime
-import streamlit as st
+import queue
+import threading
 from db_operations.dbop_price_tracking import DatabaseOperationsPriceTracking
-from constants import WEB_SITES
-from typing import Dict
+from selenium_utils.scraper_session import ScraperSessionManager
+from selenium_utils.scrape_cache import ScrapeCache
+from selenium_utils.listing_crawler import load_listing_urls
+from price_tracking.scheduler import PriceCheckScheduler
+from constants import WEB_SITES, LISTING_CRAWLERS
+from typing import Callable, Dict, List, Optional, Tuple
+
+ProgressCallback = Callable[[Dict], None]
 
 class PriceTracker:
-    def __init__(self):
+    """UI-agnostic price tracking engine.
+
+    Progress is reported through an optional callback that receives event
+    dicts with a ``type`` of ``started``, ``progress``, ``error`` or
+    ``finished``; the Streamlit page and the daemon plug in their own.
+    """
+    DEFAULT_SCRAPER_KWARGS = {"block_resources": True, "page_load_strategy": "eager"}
+
+    def __init__(self, workers: int = 2, workers_per_site: Optional[Dict[str, int]] = None,
+                 max_pages_per_driver: int = 200, use_http: bool = True, flush_every: int = 200,
+                 daily_budget: Optional[int] = None, scheduler: Optional[PriceCheckScheduler] = None,
+                 scraper_kwargs: Optional[Dict] = None, cache: Optional[ScrapeCache] = None,
+                 use_cache: bool = True, listing_urls: Optional[List[str]] = None):
+        """*workers* is the default number of browser workers per site; it can
+        be overridden for individual sites through *workers_per_site*. With
+        *use_http* prices are read over plain HTTP where the site allows it and
+        Chrome is only started for pages that need it. Price results are
+        written to the database in batches of *flush_every* products.
+
+        Products are checked in the order chosen by *scheduler*; with
+        *daily_budget* set, at most that many products are checked per day.
+
+        *scraper_kwargs* are passed to every browser scraper; by default
+        price checks block page assets and use the eager page load strategy.
+
+        With *use_cache*, prices scraped recently (e.g. by Add Product) are
+        taken from the scrape cache instead of fetching the page again.
+
+        Before any product page is loaded, the category/search pages in
+        *listing_urls* (default: ``listing_pages.txt``; pass ``[]`` to turn
+        this off) are crawled and every due product found there is priced
+        from the listing."""
         self.db = DatabaseOperationsPriceTracking()
+        self.workers = workers
+        self.workers_per_site = workers_per_site or {}
+        self.max_pages_per_driver = max_pages_per_driver
+        self.use_http = use_http
+        self.flush_every = flush_every
+        self.daily_budget = daily_budget
+        self.scheduler = scheduler or PriceCheckScheduler()
+        self.scraper_kwargs = scraper_kwargs if scraper_kwargs is not None else dict(self.DEFAULT_SCRAPER_KWARGS)
+        self._owns_cache = cache is None and use_cache
+        self.cache = cache if cache is not None else (ScrapeCache() if use_cache else None)
+        self.listing_urls = load_listing_urls() if listing_urls is None else listing_urls
+        self._listing_stats: Dict[str, float] = {}
+        self._pending: List[Tuple[int, float, float]] = []
+        self._failures: List[Tuple[int, str]] = []
+        self._notify: ProgressCallback = lambda event: None
 
-    def track_prices(self) -> Dict[str, int]:
+    def track_prices(self, progress_callback: Optional[ProgressCallback] = None,
+                     stop_event: Optional[threading.Event] = None) -> Dict[str, float]:
+        """Check every due product. Setting *stop_event* ends the run early;
+        results gathered so far are still written, so the next run resumes
+        with the products that were not checked yet."""
+        notify = self._notify = progress_callback or (lambda event: None)
+        stop_event = stop_event or threading.Event()
         try:
-            products = self.db.get_products_for_tracking()
-            stats = {"total": len(products), "updated": 0, "unchanged": 0, "failed": 0}
+            limit = None
+            if self.daily_budget is not None:
+                limit = max(self.daily_budget - self.db.get_today_tracked_count(), 0)
+            products = self.db.get_products_for_tracking(limit)
+            stats = {"total": len(products), "processed": 0, "updated": 0, "unchanged": 0, "failed": 0}
+            notify({"type": "started", "total": stats["total"]})
 
-            # Show initial information and prepare placeholders for dynamic updates in Streamlit UI
-            st.write(f"Total products to check: {stats['total']}")
-            progress_bar = st.progress(0)
-            status_placeholder = st.empty()
+            products = self._check_listings(products, stats, stop_event)
 
-            for idx, (product_id, link, current_price, site) in enumerate(products, start=1):
-                # Update status for the currently processed product
-                status_placeholder.text(f"Processing product {idx}/{stats['total']} (ID: {product_id})")
-                progress_bar.progress(int(idx / stats['total'] * 100))
+            results = queue.Queue()
+            sessions, threads = self._start_workers(products, results, stop_event)
 
+            # Workers only scrape; every DB write, stats update and callback happens on this thread
+            while stats["processed"] < stats["total"]:
                 try:
-                    scraper_class = WEB_SITES.get(site)
-                    if not scraper_class:
-                        stats["failed"] += 1
-                        continue
-
-                    scraper = scraper_class()
-                    product_details = scraper.get_product_details(link)
-                    scraper.quit()
-
-                    if not product_details or "Price" not in product_details:
-                        stats["failed"] += 1
-                        continue
-
-                    new_price = float(product_details["Price"])
-                    
-                    if new_price <= 0:
-                        print(f"Skipping zero or negative price for product {product_id}")
-                        stats["failed"] += 1
-                        continue
-                        
-                    success = self.db.record_price_change(product_id, current_price, new_price)
-
-                    if not success:
-                        stats["failed"] += 1
-                        continue
-
-                    if current_price != new_price:
-                        stats["updated"] += 1
-                    else:
-                        stats["unchanged"] += 1
+                    product_id, current_price, product_details, error = results.get(timeout=1)
+                except queue.Empty:
+                    if stop_event.is_set() and not any(thread.is_alive() for thread in threads) and results.empty():
+                        break
+                    continue
 
+                stats["processed"] += 1
+                try:
+                    if error is not None:
+                        raise error
+                    self._handle_result(product_id, current_price, product_details, stats)
                 except Exception as e:
-                    # Show error in Streamlit and also keep printing to console for debugging purposes
                     error_msg = f"Error tracking price for product {product_id}: {e}"
-                    st.error(error_msg)
                     print(error_msg)
-                    stats["failed"] += 1
+                    notify({"type": "error", "product_id": product_id, "message": error_msg})
+                    self._fail(product_id, stats, f"error: {e}"[:200])
+
+                notify({"type": "progress", "product_id": product_id, "stats": dict(stats)})
 
-            # Final update after processing all products
-            status_placeholder.text("Price tracking completed.")
-            progress_bar.progress(100)
+            self._flush(stats)
 
+            for thread in threads:
+                thread.join()
+
+            stats.update(ScraperSessionManager.merge_timing_summaries(sessions))
+            stats.update(self._listing_stats)
+            notify({"type": "finished", "stopped": stop_event.is_set(), "stats": dict(stats)})
             return stats
             
         finally:
-            self.db.close()
\ No newline at end of file
+            self.db.close()
+            if self._owns_cache:
+                self.cache.close()
+
+    def _check_listings(self, products: List[Tuple], stats: Dict, stop_event: threading.Event) -> List[Tuple]:
+        """Price every product found on the listing pages in one batch and
+        return the products that still need their own page load."""
+        if not self.listing_urls or stop_event.is_set():
+            return products
+
+        matched: List[Tuple[int, float, float]] = []
+        listing_stats = {"listing_matches": 0}
+        for site, crawler_class in LISTING_CRAWLERS.items():
+            site_products = [product for product in products if product[3] == site]
+            if not site_products:
+                continue
+            crawler = crawler_class()
+            try:
+                site_matched, _ = crawler.match(site_products, crawler.crawl(self.listing_urls))
+            except Exception as e:
+                print(f"Listing crawl for {site} failed, falling back to product pages: {e}")
+                continue
+            finally:
+                crawler.quit()
+            matched += site_matched
+            for key, value in crawler.stats.items():
+                listing_stats[key] = listing_stats.get(key, 0) + value
+        listing_stats["listing_matches"] = len(matched)
+        self._listing_stats = listing_stats
+
+        if not matched:
+            return products
+        print(f"Priced {len(matched)} products from {listing_stats.get('listing_pages', 0)} listing pages")
+
+        for product_id, current_price, new_price in matched:
+            stats["processed"] += 1
+            self._handle_result(product_id, current_price, {"Price": new_price}, stats)
+        self._flush(stats)
+        self._notify({"type": "progress", "product_id": None, "stats": dict(stats)})
+
+        matched_ids = {product_id for product_id, _, _ in matched}
+        return [product for product in products if product[0] not in matched_ids]
+
+    def _start_workers(self, products: List[Tuple], results: queue.Queue,
+                       stop_event: threading.Event) -> Tuple[List[ScraperSessionManager], List[threading.Thread]]:
+        work_queues: Dict[str, queue.Queue] = {}
+        for product_id, link, current_price, site in products:
+            if site not in WEB_SITES:
+                results.put((product_id, current_price, None, None))
+                continue
+            work_queues.setdefault(site, queue.Queue()).put((product_id, link, current_price))
+
+        sessions = []
+        threads = []
+        for site, work_queue in work_queues.items():
+            worker_count = min(self.workers_per_site.get(site, self.workers), work_queue.qsize())
+            for n in range(max(worker_count, 1)):
+                session = ScraperSessionManager(
+                    max_pages_per_driver=self.max_pages_per_driver,
+                    scraper_kwargs=self.scraper_kwargs,
+                    use_http=self.use_http,
+                    cache=self.cache,
+                    price_only=True,
+                )
+                thread = threading.Thread(
+                    target=self._worker,
+                    args=(site, work_queue, results, session, stop_event),
+                    name=f"price-tracker-{site}-{n}",
+                    daemon=True,
+                )
+                thread.start()
+                sessions.append(session)
+                threads.append(thread)
+
+        return sessions, threads
+
+    @staticmethod
+    def _worker(site: str, work_queue: queue.Queue, results: queue.Queue, session: ScraperSessionManager,
+                stop_event: threading.Event):
+        # Each worker owns its session, so every thread drives its own BaseScraper
+        try:
+            while not stop_event.is_set():
+                try:
+                    product_id, link, current_price = work_queue.get_nowait()
+                except queue.Empty:
+                    return
+
+                try:
+                    product_details = session.get_product_details(site, link)
+                    results.put((product_id, current_price, product_details, None))
+                except Exception as e:
+                    results.put((product_id, current_price, None, e))
+        finally:
+            session.close()
+
+    def _handle_result(self, product_id: int, current_price, product_details: Optional[Dict], stats: Dict):
+        if product_details and product_details.get("Redirected"):
+            # Removed products are usually redirected to their category; back off and quarantine them
+            self._fail(product_id, stats, "redirected")
+            return
+        if not product_details or "Price" not in product_details:
+            self._fail(product_id, stats, "no product data")
+            return
+
+        new_price = float(product_details["Price"])
+
+        if new_price <= 0:
+            print(f"Skipping zero or negative price for product {product_id}")
+            self._fail(product_id, stats, "invalid price")
+            return
+
+        self._pending.append((product_id, current_price, new_price))
+        if len(self._pending) + len(self._failures) >= self.flush_every:
+            self._flush(stats)
+
+    def _fail(self, product_id: int, stats: Dict, reason: str):
+        stats["failed"] += 1
+        self._failures.append((product_id, reason))
+
+    def _flush(self, stats: Dict):
+        # Failed products back off exponentially and are quarantined after repeated failures
+        failures, self._failures = self._failures, []
+        self.db.record_tracking_failures(failures, **self.scheduler.failure_policy())
+
+        pending, self._pending = self._pending, []
+        if pending and not self.db.record_price_changes_batch(pending):
+            # Isolate the bad rows instead of failing the whole batch
+            print(f"Batch write of {len(pending)} prices failed, retrying one by one")
+            for product_id, current_price, new_price in pending:
+                if self.db.record_price_change(product_id, current_price, new_price):
+                    self._count_result(current_price, new_price, stats)
+                else:
+                    stats["failed"] += 1
+        else:
+            for _, current_price, new_price in pending:
+                self._count_result(current_price, new_price, stats)
+
+        if pending:
+            self._schedule_next_checks(pending)
+
+        # Everything up to here is committed; a restarted run skips these products
+        self._notify({"type": "checkpoint", "stats": dict(stats)})
+
+    def _schedule_next_checks(self, results: List[Tuple[int, float, float]]):
+        prices = {product_id: new_price for product_id, _, new_price in results}
+        history = self.db.get_price_change_stats(list(prices))
+        self.db.schedule_next_checks(self.scheduler.plan_batch(prices, history))
+
+    @staticmethod
+    def _count_result(current_price, new_price: float, stats: Dict):
+        if current_price != new_price:
+            stats["updated"] += 1
+        else:
+            stats["unchanged"] += 1
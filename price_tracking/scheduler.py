@@ -0,0 +1,85 @@
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+class PriceCheckScheduler:
+    """Decide how soon each product should be checked again and how valuable that check is.
+
+    The inputs come from the product's price_changes history:
+
+    * change frequency: products that changed often in the last 30 days are
+      expected to change again soon, products that never change can wait;
+    * recency: a product that just moved gets a short interval;
+    * proximity to the 7/30-day low: a small drop would flip the
+      ``is_last_*_lower_price`` flags, so those products are checked daily.
+
+    The priority is used to spend a fixed daily budget of page loads on the
+    products most likely to show a meaningful change first.
+
+    Failed checks back off exponentially from *failure_backoff_hours*; after
+    *quarantine_after* consecutive failures (dead links, removed listings) a
+    product is quarantined and only re-probed every *reprobe_hours*.
+    """
+    MIN_INTERVAL_HOURS = 12
+    MAX_INTERVAL_HOURS = 7 * 24
+    RECENT_CHANGE_DAYS = 2
+    NEAR_LOW_RATIO = 1.03
+    FAILURE_BACKOFF_HOURS = 6
+    MAX_FAILURE_BACKOFF_HOURS = 72
+    QUARANTINE_AFTER_FAILURES = 5
+    REPROBE_HOURS = 7 * 24
+
+    def __init__(self, min_interval_hours: float = MIN_INTERVAL_HOURS,
+                 max_interval_hours: float = MAX_INTERVAL_HOURS,
+                 failure_backoff_hours: float = FAILURE_BACKOFF_HOURS,
+                 max_failure_backoff_hours: float = MAX_FAILURE_BACKOFF_HOURS,
+                 quarantine_after: int = QUARANTINE_AFTER_FAILURES,
+                 reprobe_hours: float = REPROBE_HOURS):
+        self.min_interval_hours = min_interval_hours
+        self.max_interval_hours = max_interval_hours
+        self.failure_backoff_hours = failure_backoff_hours
+        self.max_failure_backoff_hours = max_failure_backoff_hours
+        self.quarantine_after = quarantine_after
+        self.reprobe_hours = reprobe_hours
+
+    def plan(self, product_id: int, price: Optional[float], history: Dict) -> Tuple[int, float, float]:
+        """Return (product_id, hours until next check, priority) for a product
+        given its stats from ``get_price_change_stats``."""
+        changes = history.get("changes_30_days") or 0
+        last_change = history.get("last_change_date")
+        days_since_change = (date.today() - last_change).days if last_change else None
+        near_low = self._is_near_low(price, history.get("min_7_days"), history.get("min_30_days"))
+
+        # Check roughly four times per expected change, within the configured bounds
+        expected_days_between_changes = 30 / max(changes, 0.5)
+        interval_hours = expected_days_between_changes * 24 / 4
+        if (days_since_change is not None and days_since_change <= self.RECENT_CHANGE_DAYS) or near_low:
+            interval_hours = min(interval_hours, 24)
+        interval_hours = min(max(interval_hours, self.min_interval_hours), self.max_interval_hours)
+
+        priority = min(changes / 4, 5.0)
+        if days_since_change is not None:
+            priority += 1 / (1 + days_since_change / 7)
+        if near_low:
+            priority += 1.0
+
+        return product_id, interval_hours, priority
+
+    def failure_policy(self) -> Dict[str, float]:
+        """Keyword arguments for ``record_tracking_failures``."""
+        return {
+            "backoff_hours": self.failure_backoff_hours,
+            "max_backoff_hours": self.max_failure_backoff_hours,
+            "quarantine_after": self.quarantine_after,
+            "reprobe_hours": self.reprobe_hours,
+        }
+
+    def plan_batch(self, prices: Dict[int, float], stats: Dict[int, Dict]) -> List[Tuple[int, float, float]]:
+        return [self.plan(product_id, price, stats.get(product_id, {})) for product_id, price in prices.items()]
+
+    def _is_near_low(self, price: Optional[float], min_7_days, min_30_days) -> bool:
+        if price is None:
+            return False
+        return any(
+            window_min is not None and float(price) <= float(window_min) * self.NEAR_LOW_RATIO
+            for window_min in (min_7_days, min_30_days)
+        )
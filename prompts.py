@@ -1,7 +1,8 @@
 import json
 import openai
-from pydantic import BaseModel
-from typing import Dict, List
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, create_model
+from functools import lru_cache
+from typing import Dict, List, Tuple, Type
 import constants
 
 class Prompts:   
@@ -40,23 +41,113 @@ class Prompts:
         return prompt
 
 
+    @staticmethod
+    def feature_scoring_messages(product_info, features) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": constants.FEATURE_PROMPT},
+            {"role": "user", "content": Prompts.generate_scoring_prompt(product_info, features)}
+        ]
+
+    @staticmethod
+    def request_feature_scores(client: openai.OpenAI, product_info, features, strict: bool = True) -> Dict[str, int]:
+        """One scoring call; API and validation errors are raised so callers can retry.
+
+        With *strict* the reply is constrained by a JSON schema of exactly
+        *features* and validated with pydantic; without it the free-form JSON
+        reply is returned as is (the per-group mode).
+        """
+        request = {
+            "model": "gpt-4o-mini",
+            "messages": Prompts.feature_scoring_messages(product_info, features),
+            "temperature": 0.0,
+        }
+        if strict:
+            request["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {
+                    "name": "feature_scores",
+                    "strict": True,
+                    "schema": Prompts.get_feature_scores_schema(features),
+                },
+            }
+        response = client.chat.completions.create(**request)
+        content = response.choices[0].message.content
+        if not strict:
+            return json.loads(content)
+        return Prompts.parse_feature_scores(content, features)
+
+    @staticmethod
+    def parse_feature_scores(content: str, features) -> Dict[str, int]:
+        """Validate a strict scoring reply, repairing it field by field where possible.
+
+        Out-of-range scores are clamped to 0-10 and unknown keys dropped, so
+        one bad value does not discard the whole product. A ValidationError is
+        only raised when a feature is missing or not a number.
+        """
+        model = Prompts.feature_scores_model(tuple(features))
+        try:
+            return model.model_validate_json(content).model_dump()
+        except ValidationError as e:
+            try:
+                reply = json.loads(content)
+            except ValueError:
+                raise e
+            if not isinstance(reply, dict):
+                raise e
+            repaired = {}
+            for key in features:
+                value = reply.get(key)
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    raise e
+                repaired[key] = min(max(int(round(value)), 0), 10)
+            print(f"Repaired invalid feature scores: {e.error_count()} field error(s)")
+            return model.model_validate(repaired).model_dump()
+
     @staticmethod
     def score_feature_group(client: openai.OpenAI, product_info, features):
-        try:            
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": constants.FEATURE_PROMPT},
-                    {"role": "user", "content": Prompts.generate_scoring_prompt(product_info, features)}
-                ],
-                temperature=0.0,
-            )
-            scores = json.loads(response.choices[0].message.content)
-            return scores
+        try:
+            return Prompts.request_feature_scores(client, product_info, features, strict=False)
         except Exception as e:
             print(f"Error scoring feature group: {e}")
             return {}
 
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def feature_scores_model(features: Tuple[str, ...]) -> Type[BaseModel]:
+        """Pydantic model accepting exactly *features*, each an integer score from 0 to 10."""
+        return create_model(
+            "FeatureScores",
+            __config__=ConfigDict(extra="forbid"),
+            **{key: (int, Field(..., ge=0, le=10)) for key in features},
+        )
+
+    @staticmethod
+    def get_feature_scores_schema(features) -> dict:
+        # Strict structured outputs need every property required and no extra keys;
+        # the 0-10 range is checked by the pydantic model instead
+        return {
+            "type": "object",
+            "properties": {key: {"type": "integer"} for key in features},
+            "required": list(features),
+            "additionalProperties": False,
+        }
+
+    @staticmethod
+    def score_all_features(client: openai.OpenAI, product_info, features=None):
+        """Score every feature (default ``ALL_FEATURES``) in one call constrained by a strict JSON schema.
+
+        A reply that cannot be repaired is asked for once more before giving up.
+        """
+        for attempt in range(2):
+            try:
+                return Prompts.request_feature_scores(client, product_info, features or constants.ALL_FEATURES)
+            except ValidationError as e:
+                print(f"Invalid feature scores{', retrying' if attempt == 0 else ''}: {e}")
+            except Exception as e:
+                print(f"Error scoring features: {e}")
+                break
+        return {}
+
     @staticmethod
     def get_categorization_function_schema(main_categories: List[str]) -> dict:
         return {
@@ -36,6 +36,7 @@ else:
             "Run Database Setup",
             "Price Changes",
             "Price Charts",
+            "Tracking Quarantine",
             "Blind Test Analysis",
             "Admin Management",
         ]
@@ -80,6 +81,10 @@ else:
     elif options == "Price Charts":
         from st_pages.price_charts import app as price_charts_app
         price_charts_app()
+
+    elif options == "Tracking Quarantine":
+        from st_pages.tracking_quarantine import app as tracking_quarantine_app
+        tracking_quarantine_app()
         
     elif options == "Blind Test Analysis":
         from st_pages.blind_test_analysis import app as blind_test_analysis_app
@@ -0,0 +1,226 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Set
+import psutil
+from constants import WEB_SITES
+from selenium_utils.scrapper import BaseScraper
+
+CHROMEDRIVER_NAMES = {"chromedriver", "chromedriver.exe"}
+
+# chromedriver PIDs of every live driver in this process, across all pools
+_live_driver_pids: Set[int] = set()
+_live_driver_pids_lock = threading.Lock()
+
+class BrowserPool:
+    """Hand out browser scrapers per site and make sure they get cleaned up.
+
+        with BrowserPool() as pool:
+            with pool.scraper("HepsiBurada") as scraper:
+                scraper.get_product_details(link)
+
+    Idle scrapers are pinged before they are handed out again; a scraper is
+    recycled after *max_pages_per_driver* page loads or once its chromedriver
+    and Chrome processes use more than *max_rss_mb* of memory. Chrome
+    processes left behind by crashed runs are reaped when the pool starts and
+    when it closes.
+    """
+
+    def __init__(self, max_pages_per_driver: int = 200, max_rss_mb: Optional[float] = 1536,
+                 scraper_kwargs: Optional[Dict] = None, reap_orphans: bool = True):
+        self.max_pages_per_driver = max_pages_per_driver
+        self.max_rss_mb = max_rss_mb
+        self.scraper_kwargs = scraper_kwargs or {}
+        self.reap_orphans = reap_orphans
+        self.stats = {"starts": 0, "startup_seconds": 0.0, "recycles": 0, "reaped": 0}
+        self._idle: Dict[str, List[BaseScraper]] = {}
+        self._live: Set[BaseScraper] = set()
+        self._lock = threading.Lock()
+        self._closed = False
+
+        if reap_orphans:
+            self.stats["reaped"] += reap_orphaned_browsers()
+
+    def acquire(self, site: str, timings: Optional[Dict[str, float]] = None) -> Optional[BaseScraper]:
+        """A healthy scraper for *site*, reusing an idle one when possible.
+
+        When a browser has to be started, its start is also added to the
+        ``driver_starts`` / ``startup_seconds`` of *timings*.
+        """
+        while True:
+            with self._lock:
+                idle = self._idle.get(site)
+                scraper = idle.pop() if idle else None
+            if scraper is None:
+                return self._start(site, timings)
+            if self.is_alive(scraper):
+                return scraper
+            print(f"Idle driver for {site} stopped responding, starting a new one")
+            self._quit(scraper)
+
+    def release(self, site: str, scraper: BaseScraper, discard: bool = False):
+        """Return *scraper* for reuse, or quit it if it is broken or due for recycling."""
+        if discard or self._closed or self.needs_recycle(scraper):
+            if not discard:
+                self._count("recycles")
+            self._quit(scraper)
+            return
+        with self._lock:
+            self._idle.setdefault(site, []).append(scraper)
+
+    @contextmanager
+    def scraper(self, site: str):
+        scraper = self.acquire(site)
+        if scraper is None:
+            raise ValueError(f"No scraper configured for site: {site}")
+        discard = False
+        try:
+            yield scraper
+        except BaseException:
+            # Keep the browser only if it still answers after the failure
+            discard = not self.is_alive(scraper)
+            raise
+        finally:
+            self.release(site, scraper, discard)
+
+    def needs_recycle(self, scraper: BaseScraper) -> bool:
+        if self.max_pages_per_driver and scraper.pages_loaded >= self.max_pages_per_driver:
+            return True
+        if self.max_rss_mb:
+            rss_mb = self.driver_rss_mb(scraper)
+            if rss_mb is not None and rss_mb > self.max_rss_mb:
+                print(f"Recycling driver using {rss_mb:.0f} MB")
+                return True
+        return False
+
+    def close(self):
+        self._closed = True
+        with self._lock:
+            scrapers = list(self._live)
+            self._idle.clear()
+        for scraper in scrapers:
+            self._quit(scraper)
+        if self.reap_orphans:
+            self._count("reaped", reap_orphaned_browsers())
+
+    @staticmethod
+    def is_alive(scraper: BaseScraper) -> bool:
+        try:
+            scraper.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def driver_rss_mb(scraper: BaseScraper) -> Optional[float]:
+        """Resident memory of the scraper's chromedriver and every Chrome process under it."""
+        pid = _driver_pid(scraper)
+        if pid is None:
+            return None
+        try:
+            process = psutil.Process(pid)
+            total = 0
+            for proc in [process] + process.children(recursive=True):
+                try:
+                    total += proc.memory_info().rss
+                except psutil.Error:
+                    pass
+            return total / (1024 * 1024)
+        except psutil.Error:
+            return None
+
+    def _start(self, site: str, timings: Optional[Dict[str, float]] = None) -> Optional[BaseScraper]:
+        scraper_class = WEB_SITES.get(site)
+        if not scraper_class:
+            return None
+
+        start = time.perf_counter()
+        scraper = scraper_class(**self.scraper_kwargs)
+        elapsed = time.perf_counter() - start
+
+        # Sessions on several threads can share one pool
+        with self._lock:
+            self.stats["startup_seconds"] += elapsed
+            self.stats["starts"] += 1
+            self._live.add(scraper)
+        if timings is not None:
+            timings["driver_starts"] += 1
+            timings["startup_seconds"] += elapsed
+        pid = _driver_pid(scraper)
+        if pid is not None:
+            with _live_driver_pids_lock:
+                _live_driver_pids.add(pid)
+        return scraper
+
+    def _count(self, key: str, amount: float = 1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def _quit(self, scraper: BaseScraper):
+        with self._lock:
+            self._live.discard(scraper)
+        pid = _driver_pid(scraper)
+        try:
+            scraper.quit()
+        except Exception as e:
+            print(f"Error quitting driver: {e}")
+        finally:
+            if pid is not None:
+                with _live_driver_pids_lock:
+                    _live_driver_pids.discard(pid)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def reap_orphaned_browsers() -> int:
+    """Kill chromedriver and automation Chrome processes whose parent has exited.
+
+    Returns the number of processes killed.
+    """
+    with _live_driver_pids_lock:
+        protected = set(_live_driver_pids)
+    for pid in list(protected):
+        try:
+            protected.update(child.pid for child in psutil.Process(pid).children(recursive=True))
+        except psutil.Error:
+            pass
+
+    orphans = []
+    for proc in psutil.process_iter(["pid", "ppid", "name", "cmdline"]):
+        info = proc.info
+        if info["pid"] in protected or not _is_automation_browser(info):
+            continue
+        if info["ppid"] in (0, 1) or not psutil.pid_exists(info["ppid"]):
+            orphans.append(proc)
+
+    killed = 0
+    for proc in orphans:
+        try:
+            victims = proc.children(recursive=True) + [proc]
+        except psutil.Error:
+            victims = [proc]
+        for victim in victims:
+            try:
+                victim.kill()
+                killed += 1
+            except psutil.Error:
+                pass
+    if killed:
+        print(f"Reaped {killed} orphaned browser processes")
+    return killed
+
+def _is_automation_browser(info: Dict) -> bool:
+    name = (info.get("name") or "").lower()
+    if name in CHROMEDRIVER_NAMES:
+        return True
+    # Only Chrome started by chromedriver, never the user's own browser
+    return "chrome" in name and "--enable-automation" in (info.get("cmdline") or [])
+
+def _driver_pid(scraper: BaseScraper) -> Optional[int]:
+    try:
+        return scraper.driver.service.process.pid
+    except AttributeError:
+        return None
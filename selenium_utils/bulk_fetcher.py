@@ -0,0 +1,125 @@
+import queue
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+from constants import SITE_CONCURRENCY
+from selenium_utils.browser_pool import BrowserPool
+from selenium_utils.scrape_cache import ScrapeCache
+from selenium_utils.scraper_session import ScraperSessionManager
+from selenium_utils.phase_timing import PhaseStats
+
+# (link, details, error); details is None when the page could not be scraped
+FetchResult = Tuple[str, Optional[Dict], Optional[str]]
+
+class BulkFetcher:
+    """Fetch many product pages of one site with a few browsers at once.
+
+        with BulkFetcher("HepsiBurada", workers=4, cache=cache) as fetcher:
+            for link, details, error in fetcher.fetch(links):
+                ...
+
+    Results are yielded in the order they finish, on the caller's thread, so
+    a Streamlit page can render each one as it arrives. Every worker drives
+    its own scraper from a shared :class:`BrowserPool`; the number of workers
+    is capped by ``SITE_CONCURRENCY`` for the site. Links whose product
+    fields are all fresh in *cache* are answered first without a browser,
+    and every fetched page is written back to the cache.
+    """
+
+    def __init__(self, site: str, workers: Optional[int] = None, cache: Optional[ScrapeCache] = None,
+                 refresh: bool = False, max_pages_per_driver: int = 200, scraper_kwargs: Optional[Dict] = None):
+        limit = SITE_CONCURRENCY.get(site, 1)
+        self.site = site
+        self.workers = max(1, min(workers or limit, limit))
+        self.cache = cache
+        self.refresh = refresh
+        self.phase_stats = PhaseStats()
+        self.pool = BrowserPool(max_pages_per_driver, scraper_kwargs={**(scraper_kwargs or {}), "phase_stats": self.phase_stats})
+        self.stats = {"cached": 0, "fetched": 0, "failed": 0, "seconds": 0.0}
+        self._sessions: List[ScraperSessionManager] = []
+        self._threads: List[threading.Thread] = []
+        self._stop_event = threading.Event()
+
+    def fetch(self, links: List[str]) -> Iterator[FetchResult]:
+        start = time.perf_counter()
+        work_queue: queue.Queue = queue.Queue()
+        for link in links:
+            cached = None if self.refresh or self.cache is None else self.cache.get(link, ScrapeCache.PRODUCT_FIELDS)
+            if cached is not None:
+                self.stats["cached"] += 1
+                yield link, cached, None
+            else:
+                work_queue.put(link)
+
+        remaining = work_queue.qsize()
+        if not remaining:
+            return
+
+        results: queue.Queue = queue.Queue()
+        for n in range(min(self.workers, remaining)):
+            session = ScraperSessionManager(pool=self.pool)
+            thread = threading.Thread(
+                target=self._worker,
+                args=(work_queue, results, session),
+                name=f"bulk-fetch-{self.site}-{n}",
+                daemon=True,
+            )
+            thread.start()
+            self._sessions.append(session)
+            self._threads.append(thread)
+
+        try:
+            while remaining:
+                try:
+                    link, details, error = results.get(timeout=1)
+                except queue.Empty:
+                    if not any(thread.is_alive() for thread in self._threads) and results.empty():
+                        break
+                    continue
+
+                remaining -= 1
+                if details and details.get("Redirected"):
+                    error, details = f"Redirected to {details['Redirected']}", None
+                if details:
+                    self.stats["fetched"] += 1
+                    if self.cache is not None and ScrapeCache.cacheable(details):
+                        self.cache.put(link, details)
+                else:
+                    self.stats["failed"] += 1
+                    error = error or "No product details returned"
+                yield link, details, error
+        finally:
+            self.stats["seconds"] += time.perf_counter() - start
+
+    def _worker(self, work_queue: queue.Queue, results: queue.Queue, session: ScraperSessionManager):
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    link = work_queue.get_nowait()
+                except queue.Empty:
+                    return
+
+                try:
+                    results.put((link, session.get_product_details(self.site, link), None))
+                except Exception as e:
+                    results.put((link, None, str(e)))
+        finally:
+            session.close()
+
+    def timing_summary(self) -> Dict:
+        summary = ScraperSessionManager.merge_timing_summaries(self._sessions)
+        summary["phases"] = PhaseStats.from_dict(summary["phases"]).merge(self.phase_stats).to_dict()
+        return summary
+
+    def close(self):
+        # Workers finish the page they are on; queued links are dropped
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join()
+        self.pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
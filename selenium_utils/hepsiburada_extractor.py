@@ -0,0 +1,194 @@
+"""Structured extraction of HepsiBurada product pages.
+
+Product pages embed their tracking data as ``const utagData = {...};``. It
+is plain JSON, so instead of running one regex per field over the blob we
+find the assignment once and JSON-decode it in place with ``raw_decode``,
+which stops at the end of the object without scanning the rest of the page.
+"""
+import json
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Pattern
+
+_UTAG_ASSIGNMENT = re.compile(r'const\s+utagData\s*=\s*')
+_PRICE_CHARS = re.compile(r'[^\d,\.]')
+# Product links end in -p-<sku> (one variant) or -pm-<product id>
+_LINK_PRODUCT_ID = re.compile(r'-pm?-([A-Za-z0-9]+)(?=[/?#"]|$)')
+_JSON_DECODER = json.JSONDecoder()
+
+@dataclass
+class HepsiBuradaProduct:
+    name: Optional[str] = None
+    price: float = 0.0
+    category_hierarchy: List[str] = field(default_factory=list)
+    rating: Optional[str] = None
+    review_count: Optional[int] = None
+    brand: Optional[str] = None
+    product_id: Optional[str] = None
+    sku: Optional[str] = None
+    status: Optional[str] = None
+    canonical_url: Optional[str] = None
+
+    @property
+    def category(self) -> Optional[str]:
+        return self.category_hierarchy[-1] if self.category_hierarchy else None
+
+    def to_details(self) -> Dict:
+        """The field names and fallbacks the scrapers have always returned."""
+        return {
+            'Product Name': self.name or "Unknown",
+            'Price': self.price,
+            'Category': self.category or "Unknown",
+            'Rating': self.rating or "Not yet evaluated",
+        }
+
+@dataclass
+class ListingEntry:
+    """One product card on a category or search listing page."""
+    product_id: Optional[str]
+    price: float
+    sku: Optional[str] = None
+    name: Optional[str] = None
+
+    @property
+    def ids(self) -> List[str]:
+        return [value.upper() for value in (self.product_id, self.sku) if value]
+
+def convert_price_str_to_float(price_str: str) -> float:
+    numeric_str = _PRICE_CHARS.sub("", price_str)
+
+    if "," in numeric_str and "." in numeric_str:
+        numeric_str = numeric_str.replace(",", "")
+    elif "," in numeric_str and "." not in numeric_str:
+        numeric_str = numeric_str.replace(",", ".")
+
+    try:
+        return float(numeric_str)
+    except ValueError:
+        return 0.0
+
+def extract_utag_data(html: str) -> Optional[Dict]:
+    match = _UTAG_ASSIGNMENT.search(html)
+    if not match:
+        return None
+    try:
+        data, _ = _JSON_DECODER.raw_decode(html, match.end())
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+def extract_product(html: str, link: Optional[str] = None) -> Optional[HepsiBuradaProduct]:
+    """The product of a product page, or None for any other page.
+
+    Listing and search pages carry a utagData blob too, so only a ``pdp``
+    page with exactly one product id is read. With *link*, that id (or the
+    sku) must also be the one the link points at, which catches dead links
+    redirected to another product.
+    """
+    data = extract_utag_data(html)
+    if data is None or data.get('page_type') != 'pdp':
+        return None
+    ids = data.get('product_ids') or []
+    if len(ids) != 1:
+        return None
+    link_id = extract_link_product_id(link) if link else None
+    if link_id and link_id not in {str(value).upper() for value in ids + list(data.get('product_skus') or [])}:
+        return None
+
+    prices = data.get('product_prices') or []
+    hierarchy = data.get('category_name_hierarchy')
+    review_count = data.get('review_count')
+
+    return HepsiBuradaProduct(
+        name=data.get('product_name_array') or _first(data.get('product_names')),
+        price=convert_price_str_to_float(prices[0]) if prices and prices[0] else 0.0,
+        category_hierarchy=hierarchy.split(' > ') if hierarchy else list(data.get('product_categories') or []),
+        rating=data.get('review_rate') or None,
+        review_count=int(review_count) if str(review_count or '').isdigit() else None,
+        brand=data.get('product_brand') or _first(data.get('product_brands')),
+        product_id=_first(data.get('product_ids')),
+        sku=_first(data.get('product_skus')),
+        status=data.get('product_status'),
+        canonical_url=data.get('canonical_url'),
+    )
+
+def extract_link_product_id(link: str) -> Optional[str]:
+    """The HepsiBurada product id or sku a product link points at, upper-cased."""
+    match = _LINK_PRODUCT_ID.search(link.split('?', 1)[0] + '?')
+    return match.group(1).upper() if match else None
+
+def extract_listing_entries(html: str) -> List[ListingEntry]:
+    """Products and prices shown on a listing page, in page order.
+
+    The utagData blob of listing pages carries parallel ``product_ids`` /
+    ``product_prices`` arrays. Pages without them give no entries, so their
+    products keep getting a product page load; prices scraped from the card
+    markup are too often the struck-through or installment price.
+    """
+    data = extract_utag_data(html)
+    if not data:
+        return []
+    ids = data.get('product_ids') or []
+    prices = data.get('product_prices') or []
+    if not ids or len(ids) != len(prices):
+        return []
+    skus = data.get('product_skus') or []
+    names = data.get('product_names') or []
+    return [
+        ListingEntry(
+            product_id=product_id,
+            price=convert_price_str_to_float(str(price)),
+            sku=skus[i] if i < len(skus) else None,
+            name=names[i] if i < len(names) else None,
+        )
+        for i, (product_id, price) in enumerate(zip(ids, prices))
+        if product_id and price
+    ]
+
+@lru_cache(maxsize=8)
+def _image_url_pattern(cdn: str) -> Pattern:
+    return re.compile(re.escape(cdn) + r'[^"\' >]+\.(?:jpg|jpeg|png)(?:/format:webp)?', re.IGNORECASE)
+
+def extract_image_urls(html: str, cdn: str, limit: int = 1, max_chars: Optional[int] = None) -> List[str]:
+    """Up to *limit* product image URLs from *cdn*, in page order.
+
+    The scan stops as soon as *limit* URLs are found, and never looks past
+    *max_chars* characters of the page when that is given.
+    """
+    urls = []
+    pattern = _image_url_pattern(cdn)
+    for match in pattern.finditer(html, 0, max_chars if max_chars is not None else len(html)):
+        urls.append(match.group(0))
+        if len(urls) >= limit:
+            break
+    return urls
+
+@lru_cache(maxsize=8)
+def _gallery_url_pattern(cdn: str) -> Pattern:
+    # /s/<store>/<size>/<image id>.jpg, where size is e.g. 424-600, 375 or 48-64
+    return re.compile(
+        re.escape(cdn) + r'/s/\d+/(\d+)(?:-(\d+))?/(\d+)\.(?:jpg|jpeg|png)(?:/format:webp)?',
+        re.IGNORECASE,
+    )
+
+def extract_gallery_urls(html: str, cdn: str, max_images: int = 8) -> List[str]:
+    """One URL per gallery image, in page order, at the largest size the page links.
+
+    The same image appears in several sizes (main view, zoom, thumbnail strip),
+    so URLs are grouped by the image id in the file name.
+    """
+    best: Dict[str, tuple] = {}
+    for match in _gallery_url_pattern(cdn).finditer(html):
+        width, height, image_id = match.group(1), match.group(2), match.group(3)
+        area = int(width) * int(height or width)
+        if image_id not in best:
+            if len(best) >= max_images:
+                continue
+            best[image_id] = (area, match.group(0))
+        elif area > best[image_id][0]:
+            best[image_id] = (area, match.group(0))
+    return [url for _, url in best.values()]
+
+def _first(values):
+    return values[0] if values else None
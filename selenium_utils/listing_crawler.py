@@ -0,0 +1,92 @@
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from selenium_utils.scrapper import HepsiBuradaHttpScraper
+from selenium_utils.hepsiburada_extractor import ListingEntry, extract_listing_entries, extract_link_product_id
+from selenium_utils.phase_timing import PhaseStats
+
+LISTING_PAGES_FILE = "listing_pages.txt"
+
+def load_listing_urls(path: str = LISTING_PAGES_FILE) -> List[str]:
+    """Listing page URLs from *path*, one per line; blank lines and ``#`` comments are skipped."""
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as file:
+        return [line.strip() for line in file if line.strip() and not line.lstrip().startswith("#")]
+
+class HepsiBuradaListingCrawler:
+    """Read prices for many products at once from category and search listings.
+
+    Each listing URL is walked page by page (``?sayfa=N``) until a page adds
+    no products or *max_pages_per_listing* is reached. Entries are matched to
+    tracked products through the product id / sku at the end of their link;
+    links pinned to one seller (``magaza=``) are left to the product page
+    scraper because listings show the default seller's price.
+    """
+    HOST = "hepsiburada.com"
+    PAGE_PARAM = "sayfa"
+
+    def __init__(self, max_pages_per_listing: int = 10, http_scraper: Optional[HepsiBuradaHttpScraper] = None,
+                 phase_stats: Optional[PhaseStats] = None):
+        self.max_pages_per_listing = max_pages_per_listing
+        self.http_scraper = http_scraper or HepsiBuradaHttpScraper(phase_stats=phase_stats)
+        self.stats = {"listing_pages": 0, "listing_failures": 0, "listing_entries": 0, "listing_seconds": 0.0}
+
+    def handles(self, url: str) -> bool:
+        host = urlsplit(url).netloc.lower()
+        return host == self.HOST or host.endswith("." + self.HOST)
+
+    def crawl(self, listing_urls: List[str]) -> Dict[str, ListingEntry]:
+        """Listing entries keyed by every id they can be matched on (product id and sku)."""
+        entries: Dict[str, ListingEntry] = {}
+        start = time.perf_counter()
+        for url in listing_urls:
+            if not self.handles(url):
+                continue
+            for page in range(1, self.max_pages_per_listing + 1):
+                html = self.http_scraper.fetch_html(self.page_url(url, page))
+                self.stats["listing_pages"] += 1
+                if html is None:
+                    self.stats["listing_failures"] += 1
+                    break
+
+                new_entries = 0
+                for entry in extract_listing_entries(html):
+                    if entry.price <= 0 or not entry.ids or entry.ids[0] in entries:
+                        continue
+                    new_entries += 1
+                    for key in entry.ids:
+                        entries.setdefault(key, entry)
+                self.stats["listing_entries"] += new_entries
+                if not new_entries:
+                    break
+        self.stats["listing_seconds"] += time.perf_counter() - start
+        return entries
+
+    @staticmethod
+    def match(products: List[Tuple], entries: Dict[str, ListingEntry]) -> Tuple[List[Tuple[int, float, float]], List[Tuple]]:
+        """Split ``(id, link, price, site)`` rows into ``(id, current_price, new_price)``
+        results found on the listings and the rows that still need a product page."""
+        matched, unmatched = [], []
+        for product in products:
+            product_id, link, current_price, _ = product
+            key = extract_link_product_id(link or "")
+            entry = entries.get(key) if key and "magaza=" not in (link or "") else None
+            if entry is None:
+                unmatched.append(product)
+            else:
+                matched.append((product_id, current_price, entry.price))
+        return matched, unmatched
+
+    @classmethod
+    def page_url(cls, url: str, page: int) -> str:
+        if page == 1:
+            return url
+        parts = urlsplit(url)
+        query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True) if key != cls.PAGE_PARAM]
+        query.append((cls.PAGE_PARAM, str(page)))
+        return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), parts.fragment))
+
+    def quit(self):
+        self.http_scraper.quit()
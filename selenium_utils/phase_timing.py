@@ -0,0 +1,126 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+PHASES = ("navigation", "ready_wait", "page_source", "parse", "description_wait", "image_download", "image_process")
+
+# Upper bounds of the histogram buckets in milliseconds; the last bucket is open-ended
+HISTOGRAM_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+class PhaseStats:
+    """Thread-safe counters and latency histograms per scraping phase.
+
+    Scrapers record into one of these from the driver thread and from their
+    image download threads; callers read it with :meth:`to_dict` or combine
+    several with :meth:`merge`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._phases: Dict[str, Dict] = {}
+
+    def add(self, phase: str, seconds: float):
+        bucket = next((i for i, bound in enumerate(HISTOGRAM_BUCKETS_MS) if seconds * 1000 <= bound),
+                      len(HISTOGRAM_BUCKETS_MS))
+        with self._lock:
+            entry = self._phases.get(phase)
+            if entry is None:
+                entry = self._phases[phase] = self._empty_entry()
+            entry["count"] += 1
+            entry["total_seconds"] += seconds
+            entry["max_seconds"] = max(entry["max_seconds"], seconds)
+            entry["histogram"][bucket] += 1
+
+    def merge(self, other: "PhaseStats") -> "PhaseStats":
+        for phase, entry in other.to_dict().items():
+            self.merge_entry(phase, entry)
+        return self
+
+    def merge_entry(self, phase: str, entry: Dict):
+        with self._lock:
+            target = self._phases.get(phase)
+            if target is None:
+                target = self._phases[phase] = self._empty_entry()
+            target["count"] += entry["count"]
+            target["total_seconds"] += entry["total_seconds"]
+            target["max_seconds"] = max(target["max_seconds"], entry["max_seconds"])
+            target["histogram"] = [a + b for a, b in zip(target["histogram"], entry["histogram"])]
+
+    def to_dict(self) -> Dict[str, Dict]:
+        """``{phase: {count, total_seconds, max_seconds, histogram}}`` in :data:`PHASES` order."""
+        with self._lock:
+            ordered = [phase for phase in PHASES if phase in self._phases]
+            ordered += [phase for phase in self._phases if phase not in PHASES]
+            return {
+                phase: {**self._phases[phase], "histogram": list(self._phases[phase]["histogram"])}
+                for phase in ordered
+            }
+
+    @staticmethod
+    def from_dict(data: Dict[str, Dict]) -> "PhaseStats":
+        stats = PhaseStats()
+        for phase, entry in (data or {}).items():
+            stats.merge_entry(phase, entry)
+        return stats
+
+    @staticmethod
+    def summary_rows(data: Dict[str, Dict]) -> List[Dict]:
+        """One row per phase with count, mean, approximate p50/p95 and max in ms, for tables."""
+        rows = []
+        for phase, entry in (data or {}).items():
+            count = entry["count"]
+            rows.append({
+                "Phase": phase,
+                "Count": count,
+                "Total (s)": round(entry["total_seconds"], 2),
+                "Mean (ms)": round(entry["total_seconds"] / count * 1000, 1) if count else 0.0,
+                "p50 (ms)": histogram_percentile(entry["histogram"], 50),
+                "p95 (ms)": histogram_percentile(entry["histogram"], 95),
+                "Max (ms)": round(entry["max_seconds"] * 1000, 1),
+            })
+        return rows
+
+    @staticmethod
+    def _empty_entry() -> Dict:
+        return {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0, "histogram": [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)}
+
+def histogram_percentile(histogram: List[int], pct: float) -> Optional[float]:
+    """Upper bound (ms) of the bucket holding the *pct* percentile; None if it is the open bucket."""
+    total = sum(histogram)
+    if not total:
+        return None
+    threshold = total * pct / 100
+    running = 0
+    for i, count in enumerate(histogram):
+        running += count
+        if running >= threshold:
+            return float(HISTOGRAM_BUCKETS_MS[i]) if i < len(HISTOGRAM_BUCKETS_MS) else None
+    return None
+
+class PhaseTimer:
+    """Timing record of one ``get_product_details`` call.
+
+    Every phase is added to the call's own record and to the scraper's
+    cumulative :class:`PhaseStats`. Phases that run more than once in a call
+    (one image download per gallery image) are summed in the record.
+    """
+
+    def __init__(self, stats: Optional[PhaseStats] = None):
+        self.stats = stats
+        self.phases: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float):
+        with self._lock:
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+        if self.stats is not None:
+            self.stats.add(name, seconds)
@@ -0,0 +1,233 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from utils.image_utils import ImageProcessor
+
+DEFAULT_CACHE_PATH = os.getenv("SCRAPE_CACHE_PATH", os.path.join(".cache", "scrape_cache.sqlite3"))
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# Query parameters that never change what a product page shows
+TRACKING_PARAMS = {"gclid", "fbclid", "yclid", "msclkid", "_gl", "ref", "wt_af", "wt_mc", "wt_gl"}
+
+def normalize_url(link: str) -> str:
+    """Cache key for *link*: lower-case scheme and host, no fragment, tracking
+    parameters dropped and the remaining query parameters sorted."""
+    parts = urlsplit(link.strip())
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith("utm_")
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ""))
+
+class ScrapeCache:
+    """Persistent cache of scraped product pages in a local SQLite file.
+
+    Every field of a details dict is stamped with the time it was scraped and
+    expires on its own TTL, so a cached entry can still answer "name and
+    description" long after its price has gone stale. The encoded variants
+    of every gallery image (``{variant: bytes}`` dicts, as stored in
+    product_images) are kept next to the details. Entries are evicted least recently used
+    first once the cache grows past *max_bytes*.
+    """
+    FIELD_TTLS = {
+        "Price": 6 * HOUR,
+        "Rating": DAY,
+        "Product Name": 30 * DAY,
+        "Category": 30 * DAY,
+        "Description": 30 * DAY,
+        "Images": 30 * DAY,
+    }
+    DEFAULT_TTL = DAY
+    PRODUCT_FIELDS = ("Product Name", "Price", "Category", "Rating", "Description", "Images")
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = 256 * 1024 * 1024,
+                 field_ttls: Optional[Dict[str, float]] = None):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.field_ttls = {**self.FIELD_TTLS, **(field_ttls or {})}
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+        # One connection shared by every thread (tracker workers included), serialised by a lock
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                details TEXT NOT NULL,
+                fetched_at TEXT NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS page_images (
+                url TEXT NOT NULL,
+                image_order INTEGER NOT NULL,
+                variant TEXT NOT NULL,
+                image_data BLOB NOT NULL,
+                PRIMARY KEY (url, image_order, variant)
+            );
+            CREATE INDEX IF NOT EXISTS idx_pages_last_access ON pages (last_access);
+        """)
+        self.conn.commit()
+
+    def get(self, link: str, fields: Iterable[str] = PRODUCT_FIELDS) -> Optional[Dict]:
+        """Cached details for *link* if every one of *fields* is still fresh, else None.
+
+        The returned dict contains all fresh fields, not only the requested ones.
+        """
+        url = normalize_url(link)
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute("SELECT details, fetched_at FROM pages WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+
+            details, fetched_at = json.loads(row[0]), json.loads(row[1])
+            fresh = {field for field, at in fetched_at.items() if now - at <= self.field_ttls.get(field, self.DEFAULT_TTL)}
+            if not set(fields) <= fresh:
+                self.stats["misses"] += 1
+                return None
+
+            result = {field: value for field, value in details.items() if field in fresh}
+            if "Images" in fresh:
+                images: Dict[int, Dict[str, bytes]] = {}
+                for image_order, variant, image in self.conn.execute(
+                    "SELECT image_order, variant, image_data FROM page_images WHERE url = ? ORDER BY image_order", (url,)
+                ):
+                    images.setdefault(image_order, {})[variant] = bytes(image)
+                result["Images"] = list(images.values())
+                result["Image"] = result["Images"][0].get(ImageProcessor.DEFAULT_VARIANT) if result["Images"] else None
+            result["Link"] = link
+
+            self.conn.execute("UPDATE pages SET last_access = ? WHERE url = ?", (now, url))
+            self.conn.commit()
+            self.stats["hits"] += 1
+            return result
+
+    @staticmethod
+    def cacheable(details: Optional[Dict]) -> bool:
+        """Whether *details* look like a fully scraped product page.
+
+        Blocked or half-loaded pages come back with a zero price or the
+        "Unknown" name placeholder; caching them would serve the bad values
+        for a whole TTL.
+        """
+        if not details:
+            return False
+        name = (details.get("Product Name") or "").strip()
+        return (details.get("Price") or 0) > 0 and name not in ("", "Unknown")
+
+    def put(self, link: str, details: Optional[Dict]):
+        """Merge *details* into the entry for *link*; only the fields present are re-stamped."""
+        if not details:
+            return
+        url = normalize_url(link)
+        now = time.time()
+        images = details.get("Images")
+        if images is None and details.get("Image"):
+            images = [details["Image"]]
+        if images is not None:
+            images = [image if isinstance(image, dict) else {ImageProcessor.DEFAULT_VARIANT: image} for image in images]
+        fields = {field: value for field, value in details.items() if field not in ("Link", "Image", "Images")}
+
+        with self._lock:
+            row = self.conn.execute("SELECT details, fetched_at FROM pages WHERE url = ?", (url,)).fetchone()
+            cached, fetched_at = (json.loads(row[0]), json.loads(row[1])) if row else ({}, {})
+            cached.update(fields)
+            fetched_at.update({field: now for field in fields})
+
+            if images is not None:
+                self.conn.execute("DELETE FROM page_images WHERE url = ?", (url,))
+                self.conn.executemany(
+                    "INSERT INTO page_images (url, image_order, variant, image_data) VALUES (?, ?, ?, ?)",
+                    [
+                        (url, i, variant, sqlite3.Binary(image))
+                        for i, variants in enumerate(images) for variant, image in variants.items()
+                    ],
+                )
+                fetched_at["Images"] = now
+
+            image_bytes = self.conn.execute(
+                "SELECT COALESCE(SUM(LENGTH(image_data)), 0) FROM page_images WHERE url = ?", (url,)
+            ).fetchone()[0]
+            details_json = json.dumps(cached, default=str)
+            self.conn.execute(
+                """
+                INSERT INTO pages (url, details, fetched_at, size_bytes, last_access)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (url) DO UPDATE SET
+                    details = excluded.details,
+                    fetched_at = excluded.fetched_at,
+                    size_bytes = excluded.size_bytes,
+                    last_access = excluded.last_access
+                """,
+                (url, details_json, json.dumps(fetched_at), len(details_json) + image_bytes, now),
+            )
+            self.stats["writes"] += 1
+            self._evict()
+            self.conn.commit()
+
+    def invalidate(self, link: str):
+        url = normalize_url(link)
+        with self._lock:
+            self.conn.execute("DELETE FROM page_images WHERE url = ?", (url,))
+            self.conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+            self.conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self.conn.execute("DELETE FROM page_images")
+            self.conn.execute("DELETE FROM pages")
+            self.conn.commit()
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM pages").fetchone()[0]
+
+    def summary(self) -> Dict[str, float]:
+        with self._lock:
+            entries, size = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM pages").fetchone()
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": entries,
+            "size_bytes": size,
+            "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def _evict(self):
+        # Trim to 90% of the limit so a full cache does not evict on every write
+        total = self.conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = self.max_bytes * 0.9
+        victims: List[str] = []
+        for url, size in self.conn.execute("SELECT url, size_bytes FROM pages ORDER BY last_access"):
+            if total <= target:
+                break
+            victims.append(url)
+            total -= size
+        self.conn.executemany("DELETE FROM page_images WHERE url = ?", [(url,) for url in victims])
+        self.conn.executemany("DELETE FROM pages WHERE url = ?", [(url,) for url in victims])
+        self.stats["evictions"] += len(victims)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,190 @@
+import time
+from typing import Dict, List, Optional, Tuple
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from constants import HTTP_SCRAPERS
+from selenium_utils.scrapper import BaseScraper
+from selenium_utils.browser_pool import BrowserPool
+from selenium_utils.scrape_cache import ScrapeCache
+from selenium_utils.phase_timing import PhaseStats
+
+class ScraperSessionManager:
+    """Keep one warm scraper (and therefore one Chrome) per site for a whole run.
+
+    Drivers come from a :class:`BrowserPool`. They are started lazily on the
+    first link of a site, recycled after *max_pages_per_driver* pages or
+    above *max_rss_mb* of memory, and restarted immediately when the browser
+    crashes. Driver startup time is accounted separately from the time spent
+    loading and parsing pages.
+
+    With *use_http* enabled, sites listed in ``HTTP_SCRAPERS`` are fetched
+    over plain HTTP first and a browser is only started for links the HTTP
+    scraper could not handle.
+
+    With a *cache*, links whose *cache_fields* are still fresh in the
+    :class:`ScrapeCache` are answered without fetching, and every fetched
+    page is written back to it.
+
+    With *price_only*, browser scrapers skip the description and the image
+    gallery, which price checks do not use.
+    """
+
+    def __init__(self, max_pages_per_driver: int = 200, scraper_kwargs: Optional[Dict] = None,
+                 use_http: bool = False, cache: Optional[ScrapeCache] = None,
+                 cache_fields: Tuple[str, ...] = ("Price",), max_rss_mb: Optional[float] = 1536,
+                 pool: Optional[BrowserPool] = None, price_only: bool = False):
+        self.use_http = use_http
+        self.price_only = price_only
+        self.cache = cache
+        self.cache_fields = cache_fields
+        # Shared by every scraper this manager starts, so recycled drivers keep their history
+        self.phase_stats = PhaseStats()
+        self._owns_pool = pool is None
+        self.pool = pool or BrowserPool(
+            max_pages_per_driver, max_rss_mb, {**(scraper_kwargs or {}), "phase_stats": self.phase_stats}
+        )
+        self._scrapers: Dict[str, BaseScraper] = {}
+        self._http_scrapers: Dict[str, object] = {}
+        self.timings = self._empty_timings()
+
+    @staticmethod
+    def _empty_timings() -> Dict[str, float]:
+        return {
+            "driver_starts": 0,
+            "driver_restarts": 0,
+            "startup_seconds": 0.0,
+            "pages": 0,
+            "page_seconds": 0.0,
+            "page_load_seconds": 0.0,
+            "http_pages": 0,
+            "http_seconds": 0.0,
+            "http_fallbacks": 0,
+            "cache_hits": 0,
+            "cache_misses": 0,
+        }
+
+    def get_scraper(self, site: str) -> Optional[BaseScraper]:
+        scraper = self._scrapers.get(site)
+        if scraper is not None:
+            return scraper
+
+        # The pool may be shared with other sessions; only starts made for this one are counted
+        scraper = self.pool.acquire(site, self.timings)
+        if scraper is None:
+            return None
+
+        self._scrapers[site] = scraper
+        return scraper
+
+    def get_product_details(self, site: str, link: str) -> Optional[Dict]:
+        if self.cache is None:
+            return self._fetch(site, link)
+
+        details = self.cache.get(link, self.cache_fields)
+        if details is not None:
+            self.timings["cache_hits"] += 1
+            return details
+        self.timings["cache_misses"] += 1
+
+        details = self._fetch(site, link)
+        if ScrapeCache.cacheable(details):
+            self.cache.put(link, details)
+        return details
+
+    def _fetch(self, site: str, link: str) -> Optional[Dict]:
+        if self.use_http and site in HTTP_SCRAPERS:
+            details = self._http_fetch(site, link)
+            if details:
+                return details
+            self.timings["http_fallbacks"] += 1
+
+        scraper = self.get_scraper(site)
+        if scraper is None:
+            return None
+
+        try:
+            details = self._timed_fetch(scraper, link)
+        except WebDriverException as e:
+            if isinstance(e, TimeoutException) or BrowserPool.is_alive(scraper):
+                raise
+            # The browser died under us: start a fresh one and retry the link once
+            print(f"Driver for {site} crashed, restarting: {e}")
+            self.restart(site)
+            scraper = self.get_scraper(site)
+            details = self._timed_fetch(scraper, link)
+
+        if self.pool.needs_recycle(scraper):
+            self.restart(site)
+
+        return details
+
+    def restart(self, site: str):
+        scraper = self._scrapers.pop(site, None)
+        if scraper is None:
+            return
+        self.timings["driver_restarts"] += 1
+        self.pool.release(site, scraper, discard=True)
+
+    def close(self):
+        for site in list(self._scrapers):
+            self.pool.release(site, self._scrapers.pop(site))
+        if self._owns_pool:
+            self.pool.close()
+
+        for http_scraper in self._http_scrapers.values():
+            http_scraper.quit()
+        self._http_scrapers.clear()
+
+    def timing_summary(self) -> Dict:
+        return ScraperSessionManager.merge_timing_summaries([self])
+
+    @staticmethod
+    def merge_timing_summaries(managers: List["ScraperSessionManager"]) -> Dict:
+        """Summed counters of *managers* plus averages and per-phase stats under ``phases``."""
+        merged = ScraperSessionManager._empty_timings()
+        phases = PhaseStats()
+        for manager in managers:
+            for key, value in manager.timings.items():
+                merged[key] += value
+            phases.merge(manager.phase_stats)
+
+        pages = merged["pages"]
+        starts = merged["driver_starts"]
+        lookups = merged["cache_hits"] + merged["cache_misses"]
+        return {
+            **merged,
+            "avg_startup_seconds": merged["startup_seconds"] / starts if starts else 0.0,
+            "avg_page_seconds": merged["page_seconds"] / pages if pages else 0.0,
+            "avg_page_load_seconds": merged["page_load_seconds"] / pages if pages else 0.0,
+            "avg_http_seconds": merged["http_seconds"] / merged["http_pages"] if merged["http_pages"] else 0.0,
+            "cache_hit_rate": merged["cache_hits"] / lookups if lookups else 0.0,
+            "phases": phases.to_dict(),
+        }
+
+    def _http_fetch(self, site: str, link: str) -> Optional[Dict]:
+        http_scraper = self._http_scrapers.get(site)
+        if http_scraper is None:
+            http_scraper = HTTP_SCRAPERS[site](phase_stats=self.phase_stats)
+            self._http_scrapers[site] = http_scraper
+
+        start = time.perf_counter()
+        try:
+            return http_scraper.get_product_details(link)
+        finally:
+            self.timings["http_seconds"] += time.perf_counter() - start
+            self.timings["http_pages"] += 1
+
+    def _timed_fetch(self, scraper: BaseScraper, link: str) -> Optional[Dict]:
+        start = time.perf_counter()
+        scraper.last_page_load_seconds = 0.0
+        try:
+            return scraper.get_product_details(link, price_only=self.price_only)
+        finally:
+            self.timings["page_seconds"] += time.perf_counter() - start
+            self.timings["page_load_seconds"] += scraper.last_page_load_seconds
+            self.timings["pages"] += 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
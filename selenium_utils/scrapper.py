@@ -3,20 +3,72 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-import re
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
 from utils.image_utils import ImageProcessor
+from selenium_utils.phase_timing import PhaseStats, PhaseTimer
+from selenium_utils.hepsiburada_extractor import (
+    extract_product, extract_image_urls, extract_gallery_urls, convert_price_str_to_float
+)
+
+USER_AGENT = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
+    'AppleWebKit/537.36 (KHTML, like Gecko) '
+    'Chrome/125.0.0.0 Safari/537.36'
+)
 
 class BaseScraper:
-    def __init__(self, driver_path: str = 'selenium_utils/driver/chromedriver.exe', headless: bool = True):
+    # Asset types the parsers never read from the rendered page (images are downloaded separately)
+    BLOCKED_RESOURCE_PATTERNS = [
+        '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico',
+        '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+        '*.css',
+        '*.mp4', '*.webm', '*.mp3', '*.m3u8',
+    ]
+    # Analytics, ads and tag managers seen on product pages
+    BLOCKED_TRACKER_PATTERNS = [
+        '*googletagmanager.com*', '*google-analytics.com*', '*doubleclick.net*',
+        '*adform.net*', '*creativecdn.com*', '*facebook.net*', '*ads-twitter.com*',
+        '*go-mpulse.net*', '*go2sdk.com*', '*glov.ai*', '*ssevt.com*', '*debugbear.com*',
+        '*cookielaw.org*', '*hotjar.com*', '*criteo.*',
+    ]
+    PAGE_LOAD_STRATEGIES = ('normal', 'eager')
+
+    def __init__(self, driver_path: str = 'selenium_utils/driver/chromedriver.exe', headless: bool = True,
+                 block_resources: bool = False, page_load_strategy: str = 'normal',
+                 extra_blocked_urls: Optional[List[str]] = None, phase_stats: Optional[PhaseStats] = None):
         """Create a Chrome driver that works reliably in head-less mode.
 
         When *headless* is True we enable the modern head-less mode and
         apply a few common *stealth* flags so that web sites do not hide
         dynamic content (price, image, etc.) from automation scripts.
+
+        *block_resources* drops images, media, fonts, stylesheets and
+        third-party trackers at the network level. With *page_load_strategy*
+        ``'eager'`` navigation returns once the DOM is parsed instead of
+        waiting for every sub-resource.
+
+        Every ``get_product_details`` call leaves its per-phase timings in
+        ``last_timings`` and adds them to *phase_stats*, which can be shared
+        between scrapers.
         """
+        if page_load_strategy not in self.PAGE_LOAD_STRATEGIES:
+            raise ValueError(f"Unsupported page load strategy: {page_load_strategy}")
+        self.page_load_strategy = page_load_strategy
+        self.block_resources = block_resources
+        self.last_page_load_seconds = 0.0
+        self.pages_loaded = 0
+        self.phase_stats = phase_stats if phase_stats is not None else PhaseStats()
+        self.last_timings = PhaseTimer(self.phase_stats)
+
         options = webdriver.ChromeOptions()
+        options.page_load_strategy = page_load_strategy
 
         # Modern head-less mode (only when requested)
         if headless:
@@ -28,139 +80,244 @@ class BaseScraper:
 
         # Stealth flags
         options.add_argument('--disable-blink-features=AutomationControlled')
-        options.add_argument(
-            '--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
-            'AppleWebKit/537.36 (KHTML, like Gecko) '
-            'Chrome/125.0.0.0 Safari/537.36'
-        )
+        options.add_argument(f'--user-agent={USER_AGENT}')
+
+        if block_resources:
+            options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
 
         self.driver = webdriver.Chrome(service=Service(driver_path), options=options)
 
-        # Remove the easy "webdriver" fingerprint
-        self.driver.execute_cdp_cmd(
-            'Page.addScriptToEvaluateOnNewDocument',
-            {
-                'source': 'Object.defineProperty(navigator, "webdriver", {get: () => undefined});'
-            },
-        )
+        try:
+            # Remove the easy "webdriver" fingerprint
+            self.driver.execute_cdp_cmd(
+                'Page.addScriptToEvaluateOnNewDocument',
+                {
+                    'source': 'Object.defineProperty(navigator, "webdriver", {get: () => undefined});'
+                },
+            )
 
-    def get_product_details(self, link):
+            if block_resources:
+                self.driver.execute_cdp_cmd('Network.enable', {})
+                self.driver.execute_cdp_cmd(
+                    'Network.setBlockedURLs',
+                    {'urls': self.BLOCKED_RESOURCE_PATTERNS + self.BLOCKED_TRACKER_PATTERNS + (extra_blocked_urls or [])},
+                )
+        except Exception:
+            # Do not leave a running Chrome behind a half-built scraper
+            self.driver.quit()
+            raise
+
+    def load_page(self, link: str, timeout: float = 5):
+        """Navigate to *link* and wait until the document is ready for parsing."""
+        ready_states = ('interactive', 'complete') if self.page_load_strategy == 'eager' else ('complete',)
+        start = time.perf_counter()
+        self.pages_loaded += 1
+        try:
+            with self.last_timings.phase('navigation'):
+                self.driver.get(link)
+            with self.last_timings.phase('ready_wait'):
+                WebDriverWait(self.driver, timeout).until(
+                    lambda d: d.execute_script("return document.readyState") in ready_states
+                )
+        finally:
+            self.last_page_load_seconds = time.perf_counter() - start
+
+    def get_product_details(self, link, price_only: bool = False):
         raise NotImplementedError
 
     def quit(self):
         self.driver.quit()
 
 class HepsiBuradaScraper(BaseScraper):
-    def _download_image(self, url: str) -> io.BytesIO:
-        """Fetch *url* with the same cookies / headers Selenium is using."""
-        session = requests.Session()
-        for cookie in self.driver.get_cookies():
-            session.cookies.set(cookie["name"], cookie["value"])
+    # Product image host; the replay benchmark points this at its local server
+    IMAGE_CDN = 'https://productimages.hepsiburada.net'
 
-        headers = {
+    def __init__(self, *args, image_workers: int = 4, max_images: int = 8, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_images = max_images
+
+        # One keep-alive session per scraper, so image downloads reuse connections
+        self.image_session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=image_workers,
+            pool_maxsize=image_workers,
+            max_retries=Retry(total=2, backoff_factor=0.5, status_forcelist=[500, 502, 504]),
+        )
+        self.image_session.mount('https://', adapter)
+        self.image_session.mount('http://', adapter)
+        self.image_session.headers.update({
             "User-Agent": self.driver.execute_script("return navigator.userAgent;"),
             "Accept": "image/avif,image/webp,image/apng,image/*,*/*;q=0.8",
-            "Referer": self.driver.current_url,
-        }
-        response = session.get(url, headers=headers, stream=True, timeout=15)
+        })
+        self._cookie_snapshot = None
+
+        self._image_executor = ThreadPoolExecutor(max_workers=image_workers, thread_name_prefix='image-download')
+
+    def _sync_cookies(self):
+        """Copy the driver's cookies into the image session if they changed since the last page."""
+        cookies = self.driver.get_cookies()
+        snapshot = tuple(sorted((cookie["name"], cookie["value"]) for cookie in cookies))
+        if snapshot == self._cookie_snapshot:
+            return
+        self.image_session.cookies.clear()
+        for cookie in cookies:
+            self.image_session.cookies.set(cookie["name"], cookie["value"])
+        self._cookie_snapshot = snapshot
+
+    def _download_image(self, url: str, referer: str) -> io.BytesIO:
+        """Fetch *url* with the same cookies / headers Selenium is using."""
+        response = self.image_session.get(url, headers={"Referer": referer}, timeout=15)
         response.raise_for_status()
         return io.BytesIO(response.content)
 
-    def get_product_details(self, link):
-        self.driver.get(link)
-        WebDriverWait(self.driver, 5).until(
-            lambda d: d.execute_script("return document.readyState") == "complete"
-        )
+    def _fetch_image(self, url: str, referer: str, timer: PhaseTimer) -> Optional[Dict[str, bytes]]:
+        try:
+            with timer.phase('image_download'):
+                image = self._download_image(url, referer)
+        except requests.exceptions.RequestException as req_e:
+            print(f"Error downloading image: {req_e}")
+            return None
+        with timer.phase('image_process'):
+            return ImageProcessor.prepare_variants(image.getvalue())
+
+    def get_product_details(self, link, price_only: bool = False):
+        """Scrape *link*; with *price_only* the description and images are
+        skipped, as price checks need neither."""
+        timer = self.last_timings = PhaseTimer(self.phase_stats)
+        self.load_page(link)
 
-        html = self.driver.page_source
-        details = {'Link': link, 'Image': None}
+        with timer.phase('page_source'):
+            html = self.driver.page_source
+        # No image keys in price-only details, so a cache merge keeps the stored images
+        details = {'Link': link} if price_only else {'Link': link, 'Image': None, 'Images': []}
         wait = WebDriverWait(self.driver, 2)
 
-        # Find the script tag containing product data
-        script_match = re.search(r'const utagData = ({.*?});', html, re.DOTALL)
-        if script_match:
-            script_content = script_match.group(1)
-            
-            # Extract product name
-            name_match = re.search(r'"product_name_array":"([^"]+)"', script_content)
-            if name_match:
-                details['Product Name'] = name_match.group(1)
-            else:
-                details['Product Name'] = "Unknown"
-
-            # Extract price
-            price_match = re.search(r'"product_prices":\["([^"]+)"\]', script_content)
-            if price_match:
-                details['Price'] = convert_price_str_to_float(price_match.group(1))
-            else:
-                details['Price'] = 0.0
-
-            # Extract category (last value in hierarchy)
-            category_match = re.search(r'"category_name_hierarchy":"([^"]+)"', script_content)
-            if category_match:
-                category_hierarchy = category_match.group(1)
-                category = category_hierarchy.split(' > ')[-1]
-                details['Category'] = category
-            else:
-                details['Category'] = "Unknown"
-
-            # Extract rating
-            rating_match = re.search(r'"review_rate":"([^"]+)"', script_content)
-            if rating_match:
-                details['Rating'] = rating_match.group(1)
-            else:
-                details['Rating'] = "Not yet evaluated"
+        with timer.phase('parse'):
+            utag_details = parse_utag_data(html, link)
+            image_urls = [] if price_only else (
+                extract_gallery_urls(html, self.IMAGE_CDN, self.max_images)
+                or extract_image_urls(html, self.IMAGE_CDN, limit=1)
+            )
+
+        if not utag_details and is_redirected(link, self.driver.current_url):
+            details['Redirected'] = self.driver.current_url
+            return details
 
+        if utag_details:
+            details.update(utag_details)
+
+        if utag_details and not price_only:
             # Extract description
             try:
-                desc_elem = wait.until(
-                    EC.visibility_of_element_located((By.CSS_SELECTOR, 'div[data-test-id="ProductDescription"]'))
-                )
+                with timer.phase('description_wait'):
+                    desc_elem = wait.until(
+                        EC.visibility_of_element_located((By.CSS_SELECTOR, 'div[data-test-id="ProductDescription"]'))
+                    )
                 details['Description'] = desc_elem.text.strip()
             except Exception as e:
                 details['Description'] = "Unknown"
 
-        # Keep existing image extraction logic
+        if image_urls:
+            print(f"Found {len(image_urls)} product images")
+            self._sync_cookies()
+            # Download and encode the variants on the image pool, never on the driver thread
+            futures = [self._image_executor.submit(self._fetch_image, url, link, timer) for url in image_urls]
+            details['Images'] = [image for image in (future.result() for future in futures) if image]
+            details['Image'] = details['Images'][0][ImageProcessor.DEFAULT_VARIANT] if details['Images'] else None
+
+        return details
+
+    def quit(self):
+        self._image_executor.shutdown(wait=False, cancel_futures=True)
+        self.image_session.close()
+        super().quit()
+
+class HepsiBuradaHttpScraper:
+    """Price-check HepsiBurada product pages without a browser.
+
+    The utagData blob is server-rendered, so a plain GET over a pooled
+    keep-alive session is enough to read name, price, category and rating.
+    ``get_product_details`` returns None when the page is blocked or the blob
+    is missing so callers can fall back to :class:`HepsiBuradaScraper`, and
+    details with only ``Redirected`` when the link now leads somewhere else.
+    """
+    BLOCKED_STATUS_CODES = {403, 429, 503}
+
+    def __init__(self, pool_size: int = 10, timeout: float = 10, phase_stats: Optional[PhaseStats] = None):
+        self.timeout = timeout
+        self.phase_stats = phase_stats if phase_stats is not None else PhaseStats()
+        self.last_timings = PhaseTimer(self.phase_stats)
+        self.last_url: Optional[str] = None
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(total=2, backoff_factor=0.5, status_forcelist=[500, 502, 504]),
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            "User-Agent": USER_AGENT,
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+            "Accept-Language": "tr-TR,tr;q=0.9,en-US;q=0.8,en;q=0.7",
+        })
+
+    def fetch_html(self, link: str) -> Optional[str]:
+        """Page HTML, or None when the request fails or is blocked.
+
+        Redirects are followed; :attr:`last_url` is where the page was found.
+        """
+        self.last_url = None
         try:
-            image_url = None
-            cdn_matches = re.findall(
-                r'https://productimages\.hepsiburada\.net[^"\' >]+\.(?:jpg|jpeg|png)(?:/format:webp)?',
-                html,
-                re.IGNORECASE,
-            )
-            print(f"CDN matches: {cdn_matches}")
-            if cdn_matches:
-                image_url = cdn_matches[0]
-            if image_url:
-                print(f"Image URL found: {image_url}")
-                img_bytes = self._download_image(image_url)
-                processed = ImageProcessor.prepare_image_for_db(img_bytes)
-                if processed:
-                    details['Image'] = processed
+            with self.last_timings.phase('navigation'):
+                response = self.session.get(link, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            print(f"HTTP fetch failed for {link}: {e}")
+            return None
 
-        except requests.exceptions.RequestException as req_e:
-            print(f"Error downloading image: {req_e}")
+        if response.status_code in self.BLOCKED_STATUS_CODES:
+            print(f"HTTP fetch blocked for {link} (status {response.status_code})")
+            return None
+        if response.status_code != 200:
+            print(f"HTTP fetch returned status {response.status_code} for {link}")
+            return None
+        self.last_url = response.url
+        return response.text
+
+    def get_product_details(self, link: str) -> Optional[Dict]:
+        timer = self.last_timings = PhaseTimer(self.phase_stats)
+        html = self.fetch_html(link)
+        if html is None:
+            return None
+
+        with timer.phase('parse'):
+            details = parse_utag_data(html, link)
+        if not details and is_redirected(link, self.last_url):
+            # A dead link HepsiBurada sends to a category, search or other product page
+            return {'Link': link, 'Redirected': self.last_url}
+        # No product_prices in utagData; let the browser scraper read the price instead
+        if not details or details.get('Price', 0.0) <= 0:
+            return None
 
+        details['Link'] = link
         return details
 
+    def quit(self):
+        self.session.close()
+
 class AmazonScraper(BaseScraper):
-    def get_product_details(self, link):
+    def get_product_details(self, link, price_only: bool = False):
         return None
 
 
-import re
-
-def convert_price_str_to_float(price_str: str) -> float:
-    numeric_str = re.sub(r"[^\d,\.]", "", price_str)
-    
-    if "," in numeric_str and "." in numeric_str:
-        numeric_str = numeric_str.replace(",", "")
-    elif "," in numeric_str and "." not in numeric_str:
-        numeric_str = numeric_str.replace(",", ".")
-        
-    try:
-        return float(numeric_str)
-    except ValueError:
-        return 0.0
+def is_redirected(link: str, final_url: Optional[str]) -> bool:
+    """Whether the browser or HTTP client ended up on another path than *link*."""
+    if not final_url:
+        return False
+    return urlsplit(link).path.rstrip('/') != urlsplit(final_url).path.rstrip('/')
 
- 
+def parse_utag_data(html: str, link: Optional[str] = None) -> Optional[Dict]:
+    """Read name, price, category and rating from the page's utagData blob;
+    None unless it is the product page of *link*."""
+    product = extract_product(html, link)
+    return product.to_details() if product else None
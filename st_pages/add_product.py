@@ -5,6 +5,8 @@ from data_writer.main_category_writer import MainCategoryWriter
 from data_writer.product_features_writer import ProductFeatureWriter
 from constants import AGE_GROUPS, GENDERS, SPECIAL_OCCASIONS, INTERESTS 
 from utils.image_utils import ImageProcessor
+from selenium_utils.scrape_cache import ScrapeCache
+from selenium_utils.browser_pool import BrowserPool
 import io
 
 def app():
@@ -20,22 +22,44 @@ def app():
         st.session_state.form_data = {}
     if "image_bytes" not in st.session_state:
         st.session_state.image_bytes = None
+    if "product_images" not in st.session_state:
+        st.session_state.product_images = []
     
     if st.session_state.current_step == "input":
         site_option = st.selectbox("Select Site", list(WEB_SITES.keys()))
         link_input = st.text_input("Enter Product Link", placeholder="Enter the product link", key="link_input")
+        refresh_cache = st.checkbox("Ignore cached data", key="refresh_cache")
 
         if st.button("Fetch Product Data"):
             if link_input:
                 scraper_class = WEB_SITES.get(site_option)
                 if scraper_class:
                     with st.spinner("Fetching product data..."):
-                        scraper = scraper_class()
-                        st.session_state.product_data = scraper.get_product_details(link_input)
-                        scraper.quit()
+                        cache = ScrapeCache()
+                        try:
+                            product_data = None if refresh_cache else cache.get(link_input)
+                            if product_data is None:
+                                with BrowserPool() as pool, pool.scraper(site_option) as scraper:
+                                    product_data = scraper.get_product_details(link_input)
+                                    phase_timings = scraper.last_timings.phases
+                                if phase_timings:
+                                    st.caption("Fetch timing: " + ", ".join(
+                                        f"{phase} {seconds * 1000:.0f} ms" for phase, seconds in phase_timings.items()
+                                    ))
+                                if ScrapeCache.cacheable(product_data):
+                                    cache.put(link_input, product_data)
+                            else:
+                                st.info("Loaded from the scrape cache.")
+                        finally:
+                            cache.close()
+                        if product_data and product_data.get("Redirected"):
+                            st.error(f"The link now redirects to {product_data['Redirected']}; the product may have been removed.")
+                            product_data = None
+                        st.session_state.product_data = product_data or {}
                         st.session_state.image_bytes = st.session_state.product_data.get("Image")
+                        st.session_state.product_images = st.session_state.product_data.get("Images") or []
                         if st.session_state.image_bytes:
-                            st.image(st.session_state.image_bytes, caption="Fetched Image (Resized)", width=150)
+                            st.image(st.session_state.image_bytes, caption="Fetched Image", width=150)
                         else:
                             st.warning("Could not fetch product image.")
 
@@ -52,8 +76,10 @@ def app():
         rating = st.text_input("Rating", value=product_data.get("Rating", ""), key="rating")
         site_option = site_option
 
-        if st.session_state.image_bytes:
-            st.image(st.session_state.image_bytes, caption="Fetched Image (Resized)", width=150)
+        if len(st.session_state.product_images) > 1:
+            st.image([image[ImageProcessor.DEFAULT_VARIANT] for image in st.session_state.product_images], caption=[f"Image {i + 1}" for i in range(len(st.session_state.product_images))], width=150)
+        elif st.session_state.image_bytes:
+            st.image(st.session_state.image_bytes, caption="Fetched Image", width=150)
 
         if st.button("Calculate Features"):
             if all([product_name, link, description, category_name, rating, price, site_option]):
@@ -166,10 +192,11 @@ def app():
                     feature_writer = ProductFeatureWriter()
                     feature_writer.save_product_features(new_product_id, edited_features)
 
-                    if st.session_state.image_bytes:
-                        img_success = db_operations.add_product_image(new_product_id, st.session_state.image_bytes)
+                    images = st.session_state.product_images or ([st.session_state.image_bytes] if st.session_state.image_bytes else [])
+                    if images:
+                        img_success = db_operations.add_product_images(new_product_id, images)
                         if not img_success:
-                             st.warning("Product added, but failed to save the image.")
+                             st.warning("Product added, but failed to save the images.")
                     
                     main_category_writer = MainCategoryWriter()
                     main_category_writer.write_main_categories()
@@ -180,6 +207,7 @@ def app():
                     st.session_state.product_features = None
                     st.session_state.form_data = {}
                     st.session_state.image_bytes = None
+                    st.session_state.product_images = []
                     st.rerun()
                 else:
                     st.error("An error occurred while adding the product (Product might already exist or DB error).")
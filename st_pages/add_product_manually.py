@@ -18,14 +18,14 @@ def app():
     site_option = st.selectbox("Select Site", list(WEB_SITES.keys()))
     
     uploaded_file = st.file_uploader("Upload Product Image", type=["png", "jpg", "jpeg", "webp"])
-    processed_image_bytes = None
+    image_variants = None
 
     if uploaded_file is not None:
         bytes_data = uploaded_file.getvalue()
         img_buffer = io.BytesIO(bytes_data)
-        processed_image_bytes = ImageProcessor.prepare_image_for_db(img_buffer)
-        if processed_image_bytes:
-            st.image(processed_image_bytes, caption="Uploaded Image (Resized)", width=150)
+        image_variants = ImageProcessor.prepare_variants(img_buffer)
+        if image_variants:
+            st.image(image_variants[ImageProcessor.DEFAULT_VARIANT], caption="Uploaded Image (Resized)", width=150)
         else:
             st.error("Could not process the uploaded image.")
 
@@ -40,8 +40,8 @@ def app():
                 )
 
                 if new_product_id:
-                    if processed_image_bytes:
-                        img_success = db_operations.add_product_image(new_product_id, processed_image_bytes)
+                    if image_variants:
+                        img_success = db_operations.add_product_images(new_product_id, [image_variants])
                         if not img_success:
                             st.warning("Product added, but failed to save the image.")
                     else:
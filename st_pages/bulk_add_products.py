@@ -1,10 +1,14 @@
+import time
 import streamlit as st
 import pandas as pd
 from st_aggrid import AgGrid, GridOptionsBuilder
 from db_operations.dbop_data import DatabaseOperationsData
 from data_writer.main_category_writer import MainCategoryWriter
 from data_writer.product_features_writer import ProductFeatureWriter
-from constants import WEB_SITES, AGE_GROUPS, GENDERS, SPECIAL_OCCASIONS, INTERESTS
+from selenium_utils.scrape_cache import ScrapeCache
+from selenium_utils.bulk_fetcher import BulkFetcher
+from selenium_utils.phase_timing import PhaseStats
+from constants import WEB_SITES, SITE_CONCURRENCY, AGE_GROUPS, GENDERS, SPECIAL_OCCASIONS, INTERESTS
 
 def create_feature_grid(df, feature_dict, title):
     st.write(f"### {title}")
@@ -62,6 +66,11 @@ def create_feature_grid(df, feature_dict, title):
     
     return df
 
+def _display_row(product):
+    item = {k: v for k, v in product.items() if k not in ('Image', 'Images')}
+    item['Site'] = st.session_state.site_option
+    return item
+
 def app():
     st.title("Bulk Add Products")
     
@@ -81,44 +90,57 @@ def app():
         st.session_state.site_option = site_option_selected
 
         bulk_links = st.text_area("Enter Product Links", placeholder="Enter one product link per line")
+        refresh_cache = st.checkbox("Ignore cached data", key="bulk_refresh_cache")
+        max_workers = SITE_CONCURRENCY.get(site_option_selected, 1)
+        fetch_workers = st.slider("Parallel browsers", 1, max_workers, max_workers, key="bulk_fetch_workers") \
+            if max_workers > 1 else 1
 
         if st.button("Fetch Bulk Products"):
             if bulk_links.strip():
-                links = [l.strip() for l in bulk_links.splitlines() if l.strip()]
+                links = list(dict.fromkeys(l.strip() for l in bulk_links.splitlines() if l.strip()))
                 scraper_class = WEB_SITES.get(st.session_state.site_option)
 
                 if scraper_class:
-                    scraper = scraper_class()
                     fetched_products_raw = []
                     failed_links = []
-                    
-                    with st.spinner(f"Fetching {len(links)} products..."):
-                        for i, l in enumerate(links):
-                            try:
-                                st.write(f"Fetching {i+1}/{len(links)}: {l}")
-                                product_details = scraper.get_product_details(l)
+
+                    progress_bar = st.progress(0, text=f"Fetching {len(links)} products...")
+                    table_placeholder = st.empty()
+                    last_render = 0.0
+
+                    cache = ScrapeCache()
+                    try:
+                        with BulkFetcher(st.session_state.site_option, workers=fetch_workers, cache=cache,
+                                         refresh=refresh_cache) as fetcher:
+                            for done, (link, product_details, error) in enumerate(fetcher.fetch(links), start=1):
                                 if product_details:
                                     fetched_products_raw.append(product_details)
                                 else:
-                                    failed_links.append((l, "No product details returned"))
-                            except Exception as e:
-                                failed_links.append((l, str(e)))
-                                st.warning(f"Failed to fetch: {l} - Error: {str(e)}")
-                                continue
-                    
-                    try:
-                        scraper.quit()
-                    except Exception:
-                        pass
+                                    failed_links.append((link, error))
+
+                                progress_bar.progress(done / len(links), text=f"Fetched {done}/{len(links)}: {link}")
+                                # Redraw at most twice a second so a long run is not dominated by rendering
+                                if time.perf_counter() - last_render > 0.5 or done == len(links):
+                                    table_placeholder.dataframe(
+                                        pd.DataFrame([_display_row(p) for p in fetched_products_raw]),
+                                        use_container_width=True,
+                                    )
+                                    last_render = time.perf_counter()
+
+                            if fetcher.stats["cached"]:
+                                st.info(f"Loaded {fetcher.stats['cached']} products from the scrape cache.")
+                            phase_rows = PhaseStats.summary_rows(fetcher.timing_summary()["phases"])
+                            if phase_rows:
+                                with st.expander(f"Fetch timing by phase ({fetcher.stats['seconds']:.0f} s total)"):
+                                    st.dataframe(phase_rows)
+                    finally:
+                        cache.close()
+                    table_placeholder.empty()
+                    progress_bar.empty()
                     
                     if fetched_products_raw:
                         st.session_state.bulk_product_data_with_images = fetched_products_raw
-                        display_data = []
-                        for p in fetched_products_raw:
-                            item = {k: v for k, v in p.items() if k != 'Image'}
-                            item['Site'] = st.session_state.site_option
-                            display_data.append(item)
-                        st.session_state.bulk_product_data = display_data
+                        st.session_state.bulk_product_data = [_display_row(p) for p in fetched_products_raw]
                         st.success(f"Fetched {len(fetched_products_raw)} products successfully!")
                         
                         if failed_links:
@@ -144,6 +166,7 @@ def app():
                     try:
                         raw_product = next((p for p in st.session_state.bulk_product_data_with_images if p['Link'] == row['Link']), None)
                         image_bytes = raw_product['Image'] if raw_product and 'Image' in raw_product else None
+                        images = (raw_product.get('Images') if raw_product else None) or ([image_bytes] if image_bytes else [])
 
                         # Make sure we have the required fields
                         if not all(k in row and pd.notna(row[k]) for k in ["Product Name", "Category"]):
@@ -178,6 +201,7 @@ def app():
                             "Description": description,
                             "Rating": row.get("Rating", 0.0),
                             "Image": image_bytes,
+                            "Images": images,
                             "Site": row.get("Site", st.session_state.site_option),
                         }
                         
@@ -204,7 +228,7 @@ def app():
             for p in st.session_state.product_features:
                 all_keys.update(p.keys())
             
-            df_display_cols = [col for col in all_keys if col not in ['Image', 'Site']]
+            df_display_cols = [col for col in all_keys if col not in ['Image', 'Images', 'Site']]
             
             # Make sure to use get() method with default value
             df_display = pd.DataFrame([{k: p.get(k, 0.0) for k in df_display_cols} for p in st.session_state.product_features])
@@ -322,11 +346,13 @@ def app():
                                 
                                 feature_writer.save_product_features(new_product_id, current_features)
 
-                                image_bytes = product_data_with_features.get("Image")
-                                if image_bytes:
-                                    img_success = db_operations.add_product_image(new_product_id, image_bytes)
+                                images = product_data_with_features.get("Images") or []
+                                if not images and product_data_with_features.get("Image"):
+                                    images = [product_data_with_features["Image"]]
+                                if images:
+                                    img_success = db_operations.add_product_images(new_product_id, images)
                                     if not img_success:
-                                        st.warning(f"Saved product {product_name}, but failed to save image.")
+                                        st.warning(f"Saved product {product_name}, but failed to save images.")
                                 
                                 success_count += 1
                             else:
@@ -1,13 +1,104 @@
+import os
+import subprocess
+import sys
+import pandas as pd
 import streamlit as st
-from price_tracking.price_tracking import PriceTracker
+from db_operations.dbop_price_tracking import DatabaseOperationsPriceTracking
+from db_operations.dbop_scrape_metrics import DatabaseOperationsScrapeMetrics
+from selenium_utils.phase_timing import PhaseStats
+
+def start_background_run():
+    # Detached from the Streamlit session, so closing the tab does not stop the run
+    subprocess.Popen(
+        [sys.executable, "-m", "price_tracking.daemon", "--once"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        start_new_session=True,
+    )
+
+def show_phase_trends(days: int = 30):
+    metrics_db = DatabaseOperationsScrapeMetrics()
+    try:
+        trends = metrics_db.get_phase_trends(days)
+    finally:
+        metrics_db.close()
+    if not trends:
+        return
+
+    st.write(f"### Scraping Phase Trends (last {days} days)")
+    chart_df = pd.DataFrame(trends).pivot(index="day", columns="phase", values="mean_ms")
+    st.line_chart(chart_df)
+    st.caption("Mean milliseconds per phase and day, from recorded price tracking runs.")
 
 def app():
     st.title("Price Changes")
-    if st.button("Start Price Tracking"):
-        price_tracker = PriceTracker()
-        stats = price_tracker.track_prices()
+
+    db_ops = DatabaseOperationsPriceTracking()
+    try:
+        running = db_ops.is_tracking_running()
+
+        col1, col2 = st.columns(2)
+        if col1.button("Start Price Tracking", disabled=running):
+            start_background_run()
+            st.success("Price tracking started in the background.")
+        col2.button("Refresh")
+
+        st.caption("Scheduled runs: `python -m price_tracking.daemon --at 03:00`")
+
+        jobs = db_ops.get_recent_tracking_jobs(limit=10)
+        if not jobs:
+            st.info("No price tracking runs yet.")
+            return
+
+        job = jobs[0]
+        status = job['status']
+        if status == 'running' and not running:
+            status = 'stopped unexpectedly'
+        st.write(f"### Run #{job['id']} ({status})")
+        if job['total']:
+            st.progress(min(int(job['processed'] / job['total'] * 100), 100))
+        st.write(f"Started: {job['started_at']:%Y-%m-%d %H:%M:%S}, last update: {job['heartbeat_at']:%Y-%m-%d %H:%M:%S}")
+
         st.write("### Price Tracking Results")
-        st.write(f"Total products checked: {stats['total']}")
-        st.write(f"Products with price changes: {stats['updated']}")
-        st.write(f"Products with unchanged prices: {stats['unchanged']}")
-        st.write(f"Failed checks: {stats['failed']}")
+        st.write(f"Total products to check: {job['total']} (processed: {job['processed']})")
+        st.write(f"Products with price changes: {job['updated']}")
+        st.write(f"Products with unchanged prices: {job['unchanged']}")
+        st.write(f"Failed checks: {job['failed']}")
+        if job['message']:
+            st.error(job['message'])
+
+        stats = job['stats']
+        if stats and 'driver_starts' in stats:
+            st.write("### Scraper Timing")
+            st.write(f"Browser starts: {stats['driver_starts']} (restarts: {stats['driver_restarts']})")
+            st.write(f"Browser startup time: {stats['startup_seconds']:.1f}s (avg {stats['avg_startup_seconds']:.2f}s per start)")
+            st.write(f"Page time: {stats['page_seconds']:.1f}s (avg {stats['avg_page_seconds']:.2f}s per page)")
+            if 'avg_page_load_seconds' in stats:
+                st.write(f"Navigation and load wait: avg {stats['avg_page_load_seconds']:.2f}s per page")
+            st.write(f"HTTP fast path: {stats['http_pages']} pages (avg {stats['avg_http_seconds']:.2f}s), {stats['http_fallbacks']} fell back to the browser")
+            if stats.get('listing_pages'):
+                st.write(f"Listing pages: {stats['listing_pages']} loaded ({stats.get('listing_failures', 0)} failed), {stats['listing_matches']} products priced without a product page")
+            if 'cache_hits' in stats:
+                st.write(f"Scrape cache: {stats['cache_hits']} hits, {stats['cache_misses']} misses ({stats['cache_hit_rate']:.0%} hit rate)")
+            if stats.get('phases'):
+                st.write("Time per scraping phase (p50/p95 are histogram bucket bounds):")
+                st.dataframe(PhaseStats.summary_rows(stats['phases']))
+
+        show_phase_trends()
+
+        st.write("### Recent Runs")
+        st.dataframe([
+            {
+                "ID": j['id'],
+                "Status": j['status'],
+                "Started": j['started_at'],
+                "Finished": j['finished_at'],
+                "Processed": f"{j['processed']}/{j['total']}",
+                "Updated": j['updated'],
+                "Failed": j['failed'],
+            }
+            for j in jobs
+        ])
+    finally:
+        db_ops.close()
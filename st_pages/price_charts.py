@@ -33,8 +33,20 @@ def app():
             df = df.sort_values('date')
             
             st.subheader(f"Price History for {selected_product_label}")
-            
-            chart = alt.Chart(df).mark_line(point=True).encode(
+
+            # Only price changes are stored, so hold the last price until the last check
+            chart_df = df[['date', 'new_price']]
+            tracking_state = db_ops.get_tracking_state(selected_product_id)
+            if tracking_state and tracking_state['last_checked_at'] and tracking_state['last_price'] is not None:
+                last_checked = pd.to_datetime(tracking_state['last_checked_at']).normalize()
+                if last_checked > chart_df['date'].max():
+                    chart_df = pd.concat([
+                        chart_df,
+                        pd.DataFrame([{'date': last_checked, 'new_price': tracking_state['last_price']}])
+                    ], ignore_index=True)
+                st.caption(f"Last checked: {tracking_state['last_checked_at']:%Y-%m-%d %H:%M}")
+            
+            chart = alt.Chart(chart_df).mark_line(point=True, interpolate='step-after').encode(
                 x=alt.X('date:T', title='Date'),
                 y=alt.Y('new_price:Q', title='Price'),
                 tooltip=['date:T', 'new_price:Q']
@@ -0,0 +1,46 @@
+import streamlit as st
+import pandas as pd
+from db_operations.dbop_price_tracking import DatabaseOperationsPriceTracking
+
+def app():
+    st.title("Tracking Quarantine")
+    st.write(
+        "Products whose price check failed too many times in a row. They are only re-probed "
+        "once a week until a check succeeds again."
+    )
+
+    db_ops = DatabaseOperationsPriceTracking()
+    try:
+        products = db_ops.get_quarantined_products()
+
+        if not products:
+            st.info("No products are quarantined.")
+            return
+
+        df = pd.DataFrame(products)
+        st.dataframe(
+            df[['id', 'product_name', 'site', 'consecutive_failures', 'last_failure_reason',
+                'last_failed_at', 'quarantined_at', 'next_check_at', 'link']],
+            use_container_width=True,
+        )
+
+        product_options = {f"{p['product_name']} ({p['site']}, id {p['id']})": p['id'] for p in products}
+        selected = st.multiselect("Select products:", options=list(product_options.keys()))
+        selected_ids = [product_options[label] for label in selected]
+
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("Re-probe now", disabled=not selected_ids):
+                if db_ops.reprobe_now(selected_ids):
+                    st.success(f"{len(selected_ids)} products will be checked on the next tracking run.")
+                else:
+                    st.error("Could not schedule the re-probe.")
+        with col2:
+            if st.button("Release", disabled=not selected_ids):
+                if db_ops.release_from_quarantine(selected_ids):
+                    st.success(f"Released {len(selected_ids)} products from quarantine.")
+                    st.rerun()
+                else:
+                    st.error("Could not release the products.")
+    finally:
+        db_ops.close()
@@ -2,6 +2,8 @@ import streamlit as st
 import pandas as pd
 from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode
 from db_operations.dbop_data import DatabaseOperationsData
+from utils.image_store import ImageStore
+from utils.grid_utils import THUMBNAIL_COLUMN, configure_thumbnail_column
 
 def app():
     st.title("View Products")
@@ -17,10 +19,17 @@ def app():
     if products:
         st.write("### Product List")
         df = pd.DataFrame(products, columns=["ID", "Category Name", "Main Category Name", "Link", "Name", "Price", "Rating"])
+        show_thumbnails = st.checkbox("Show thumbnails", value=True)
+        if show_thumbnails:
+            # One batched lookup for the rows on this page; repeat visits are served from the in-process LRU
+            thumbnails = ImageStore(db_operations).thumbnail_data_uris(df["ID"].tolist())
+            df.insert(0, THUMBNAIL_COLUMN, df["ID"].map(thumbnails).fillna(""))
         gb = GridOptionsBuilder.from_dataframe(df)
         
         for col in df.columns:
             gb.configure_column(col, width=150)
+        if show_thumbnails:
+            configure_thumbnail_column(gb)
             
         gb.configure_default_column(filter=True, sortable=True)
         
@@ -0,0 +1,17 @@
+CREATE TABLE IF NOT EXISTS price_tracking_state (
+    product_id INTEGER PRIMARY KEY REFERENCES product(id) ON DELETE CASCADE,
+    last_checked_at TIMESTAMP,
+    last_price NUMERIC,
+    consecutive_failures INTEGER NOT NULL DEFAULT 0,
+    last_failed_at TIMESTAMP,
+    next_check_at TIMESTAMP,
+    priority DOUBLE PRECISION,
+    min_7_days NUMERIC,
+    min_30_days NUMERIC,
+    last_failure_reason TEXT,
+    quarantined_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_price_tracking_state_last_checked_at ON price_tracking_state (last_checked_at);
+CREATE INDEX IF NOT EXISTS idx_price_tracking_state_next_check_at ON price_tracking_state (next_check_at);
+CREATE INDEX IF NOT EXISTS idx_price_tracking_state_quarantined_at ON price_tracking_state (quarantined_at) WHERE quarantined_at IS NOT NULL;
@@ -0,0 +1,9 @@
+-- Lowest observed price per product per day, kept for the last 30 days only
+CREATE TABLE IF NOT EXISTS price_daily_minima (
+    product_id INTEGER NOT NULL REFERENCES product(id) ON DELETE CASCADE,
+    day DATE NOT NULL DEFAULT CURRENT_DATE,
+    min_price NUMERIC NOT NULL,
+    PRIMARY KEY (product_id, day)
+);
+
+CREATE INDEX IF NOT EXISTS idx_price_daily_minima_day ON price_daily_minima (day);
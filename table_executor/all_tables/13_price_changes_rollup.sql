@@ -0,0 +1,12 @@
+-- Compacted price history: old price_changes rows rolled up per week, and per month once they are older still
+CREATE TABLE IF NOT EXISTS price_changes_rollup (
+    product_id INTEGER NOT NULL REFERENCES product(id) ON DELETE CASCADE,
+    period TEXT NOT NULL CHECK (period IN ('week', 'month')),
+    period_start DATE NOT NULL,
+    min_price NUMERIC NOT NULL,
+    max_price NUMERIC NOT NULL,
+    first_old_price NUMERIC NOT NULL,
+    last_price NUMERIC NOT NULL,
+    change_count INTEGER NOT NULL,
+    PRIMARY KEY (product_id, period, period_start)
+);
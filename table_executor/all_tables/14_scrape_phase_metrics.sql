@@ -0,0 +1,14 @@
+-- Per-phase scraper timings of each run, kept for trend charts
+CREATE TABLE IF NOT EXISTS scrape_phase_metrics (
+    id SERIAL PRIMARY KEY,
+    recorded_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    source TEXT NOT NULL,
+    job_id INTEGER REFERENCES price_tracking_jobs(id) ON DELETE SET NULL,
+    phase TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    total_seconds DOUBLE PRECISION NOT NULL,
+    max_seconds DOUBLE PRECISION NOT NULL,
+    histogram INTEGER[] NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_scrape_phase_metrics_recorded_at ON scrape_phase_metrics (recorded_at);
@@ -0,0 +1,7 @@
+-- Image bytes stored once per content hash (hex SHA-256); product_images rows point here
+CREATE TABLE IF NOT EXISTS image_blobs (
+    hash TEXT PRIMARY KEY,
+    data BYTEA NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
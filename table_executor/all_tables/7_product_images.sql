@@ -1,6 +1,18 @@
 CREATE TABLE IF NOT EXISTS product_images (
     id SERIAL PRIMARY KEY,
     product_id INTEGER REFERENCES product(id) ON DELETE CASCADE,
-    image_data BYTEA NOT NULL,
-    image_order INTEGER DEFAULT 0
-); 
\ No newline at end of file
+    image_data BYTEA,
+    image_order INTEGER DEFAULT 0,
+    image_hash TEXT REFERENCES image_blobs(hash),
+    variant TEXT NOT NULL DEFAULT 'small'
+);
+
+-- Columns added after the table was first released; image_data is only set on rows
+-- written before image_blobs existed, until the backfill moves them over. Rows from
+-- before size variants existed are 150px images, hence the 'small' default
+ALTER TABLE product_images ADD COLUMN IF NOT EXISTS image_hash TEXT REFERENCES image_blobs(hash);
+ALTER TABLE product_images ALTER COLUMN image_data DROP NOT NULL;
+ALTER TABLE product_images ADD COLUMN IF NOT EXISTS variant TEXT NOT NULL DEFAULT 'small';
+
+CREATE INDEX IF NOT EXISTS idx_product_images_product_id ON product_images (product_id, image_order);
+CREATE INDEX IF NOT EXISTS idx_product_images_image_hash ON product_images (image_hash);
@@ -1,7 +1,46 @@
 CREATE TABLE IF NOT EXISTS price_changes (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
     product_id INTEGER REFERENCES product(id) ON DELETE CASCADE,
     old_price NUMERIC NOT NULL,
     new_price NUMERIC NOT NULL,
-    created_date DATE NOT NULL DEFAULT CURRENT_DATE
-); 
\ No newline at end of file
+    created_date DATE NOT NULL DEFAULT CURRENT_DATE,
+    PRIMARY KEY (id, created_date)
+) PARTITION BY RANGE (created_date);
+
+-- Creates the monthly partitions price_changes_YYYY_MM from start_month up to months_ahead months from now
+CREATE OR REPLACE FUNCTION ensure_price_changes_partitions(months_ahead INTEGER DEFAULT 2, start_month DATE DEFAULT CURRENT_DATE)
+RETURNS void AS $$
+DECLARE
+    month_start DATE := date_trunc('month', start_month)::date;
+    last_month DATE := (date_trunc('month', CURRENT_DATE) + make_interval(months => months_ahead))::date;
+    partition_name TEXT;
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'price_changes'::regclass) <> 'p' THEN
+        RETURN;
+    END IF;
+
+    WHILE month_start <= last_month LOOP
+        partition_name := format('price_changes_%s', to_char(month_start, 'YYYY_MM'));
+        IF to_regclass(partition_name) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF price_changes FOR VALUES FROM (%L) TO (%L)',
+                partition_name, month_start, (month_start + INTERVAL '1 month')::date
+            );
+        END IF;
+        month_start := (month_start + INTERVAL '1 month')::date;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Installations created before partitioning keep a plain table until it is migrated
+-- with `python -m price_tracking.maintenance --migrate`
+DO $$
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'price_changes'::regclass) = 'p' THEN
+        CREATE TABLE IF NOT EXISTS price_changes_default PARTITION OF price_changes DEFAULT;
+        PERFORM ensure_price_changes_partitions(2);
+    END IF;
+END $$;
+
+CREATE INDEX IF NOT EXISTS idx_price_changes_product_id_created_date ON price_changes (product_id, created_date);
+CREATE INDEX IF NOT EXISTS idx_price_changes_created_date ON price_changes (created_date);
@@ -2,11 +2,17 @@ import os
 from config.db_config import get_db_connection
 
 class TableExecutorUtil:
+    @staticmethod
+    def _file_order(sql_file):
+        # Files are numbered so that referenced tables are created first ("10_" after "9_")
+        prefix = sql_file.split("_", 1)[0]
+        return (int(prefix) if prefix.isdigit() else float("inf"), sql_file)
+
     def create_tables(self, tables_folder_path):
         conn = get_db_connection()
         cursor = conn.cursor()
 
-        for sql_file in os.listdir(tables_folder_path):
+        for sql_file in sorted(os.listdir(tables_folder_path), key=self._file_order):
             if sql_file.endswith(".sql"):
                 file_path = os.path.join(tables_folder_path, sql_file)
                 with open(file_path, 'r') as file:
@@ -0,0 +1,35 @@
+from st_aggrid import GridOptionsBuilder, JsCode
+
+THUMBNAIL_COLUMN = "Image"
+THUMBNAIL_HEIGHT = 48
+
+# Cells hold a data: URI (or nothing); needs allow_unsafe_jscode=True on the AgGrid call
+THUMBNAIL_RENDERER = JsCode(f"""
+class ThumbnailRenderer {{
+    init(params) {{
+        this.eGui = document.createElement('span');
+        if (params.value) {{
+            const img = document.createElement('img');
+            img.src = params.value;
+            img.loading = 'lazy';
+            img.style.maxHeight = '{THUMBNAIL_HEIGHT}px';
+            img.style.maxWidth = '{THUMBNAIL_HEIGHT}px';
+            this.eGui.appendChild(img);
+        }}
+    }}
+    getGui() {{
+        return this.eGui;
+    }}
+}}
+""")
+
+def configure_thumbnail_column(gb: GridOptionsBuilder, column: str = THUMBNAIL_COLUMN):
+    gb.configure_column(
+        column,
+        cellRenderer=THUMBNAIL_RENDERER,
+        width=THUMBNAIL_HEIGHT + 24,
+        filter=False,
+        sortable=False,
+        pinned="left",
+    )
+    gb.configure_grid_options(rowHeight=THUMBNAIL_HEIGHT + 8)
@@ -0,0 +1,118 @@
+"""Read product images by content hash through an in-process LRU.
+
+    python -m utils.image_store --backfill   # move old product_images.image_data rows into image_blobs
+    python -m utils.image_store --prune      # delete blobs no product uses any more
+"""
+import argparse
+import base64
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+from db_operations.dbop_data import DatabaseOperationsData, DEFAULT_IMAGE_VARIANT
+from utils.image_utils import ImageProcessor
+
+class ImageLRU:
+    """Thread-safe LRU of image bytes keyed by hash, bounded by total size."""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._images: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, image_hash: str) -> Optional[bytes]:
+        with self._lock:
+            image = self._images.get(image_hash)
+            if image is None:
+                self.stats["misses"] += 1
+                return None
+            self._images.move_to_end(image_hash)
+            self.stats["hits"] += 1
+            return image
+
+    def put(self, image_hash: str, image: bytes):
+        if len(image) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._images.pop(image_hash, None)
+            if previous is not None:
+                self.size_bytes -= len(previous)
+            self._images[image_hash] = image
+            self.size_bytes += len(image)
+            while self.size_bytes > self.max_bytes:
+                _, evicted = self._images.popitem(last=False)
+                self.size_bytes -= len(evicted)
+                self.stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+            self.size_bytes = 0
+
+# Shared by every page of the Streamlit process; blobs never change for a hash, so entries never go stale
+image_cache = ImageLRU()
+
+class ImageStore:
+    """Images by hash from :data:`image_cache`, reading only the misses from image_blobs."""
+
+    def __init__(self, db: DatabaseOperationsData, cache: ImageLRU = image_cache):
+        self.db = db
+        self.cache = cache
+
+    def get(self, image_hash: str) -> Optional[bytes]:
+        return self.get_many([image_hash]).get(image_hash)
+
+    def get_many(self, hashes: Iterable[str]) -> Dict[str, bytes]:
+        images: Dict[str, bytes] = {}
+        missing: List[str] = []
+        for image_hash in dict.fromkeys(hashes):
+            image = self.cache.get(image_hash)
+            if image is None:
+                missing.append(image_hash)
+            else:
+                images[image_hash] = image
+
+        for image_hash, image in self.db.iter_image_blobs(missing):
+            self.cache.put(image_hash, image)
+            images[image_hash] = image
+        return images
+
+    def product_images(self, product_ids: List[int], variant: str = DEFAULT_IMAGE_VARIANT,
+                       first_only: bool = False) -> Dict[int, List[bytes]]:
+        """Images per product in gallery order; with *first_only* just the main image."""
+        hashes = self.db.get_product_image_hashes(product_ids, variant, first_only)
+        images = self.get_many(h for product_hashes in hashes.values() for h in product_hashes)
+        return {
+            product_id: [images[h] for h in product_hashes if h in images]
+            for product_id, product_hashes in hashes.items()
+        }
+
+    def thumbnail_data_uris(self, product_ids: List[int], variant: str = "thumb") -> Dict[int, str]:
+        """Main image of each product as a ``data:`` URI for grid cells; one query for all rows."""
+        return {
+            product_id: f"data:{ImageProcessor.mime_type(images[0])};base64,{base64.b64encode(images[0]).decode('ascii')}"
+            for product_id, images in self.product_images(product_ids, variant, first_only=True).items()
+            if images
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description="Product image store maintenance.")
+    parser.add_argument("--backfill", action="store_true", help="move image_data of old rows into image_blobs")
+    parser.add_argument("--prune", action="store_true", help="delete blobs no product image points to")
+    parser.add_argument("--batch-size", type=int, default=500, help="rows moved per transaction")
+    args = parser.parse_args()
+    if not (args.backfill or args.prune):
+        parser.error("nothing to do, pass --backfill and/or --prune")
+
+    db = DatabaseOperationsData()
+    try:
+        if args.backfill:
+            print(f"Moved {db.backfill_image_blobs(args.batch_size)} product images into image_blobs.")
+        if args.prune:
+            print(f"Deleted {db.delete_orphaned_image_blobs()} unused image blobs.")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()